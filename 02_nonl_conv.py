@@ -1,63 +1,33 @@
-import numpy
-from matplotlib import pyplot
-from matplotlib import cm
+import cfd
+from cfd import plotting
 
 ## Variable declaration
-# parameters
-c = 1
-
 # time 
 t_max = 0.5
 nt = 151
 dt = t_max/nt
+# Adaptive time-steps: safety factor on the CFL limit (e.g. 0.9), steps
+# up to t_max exactly; None: nt steps of dt
+cfl = None
 
 # mesh
-nx = 51
-xmin = 0
-xmax = 2
-dx = (xmax-xmin)/(nx-1)
-x = numpy.linspace(xmin, xmax, nx)
+grid = cfd.Grid1D(51, 0, 2)
+dx = grid.dx
+x = grid.x
 
 # Initialize dependent variable
-u = numpy.ones(nx)
-up = numpy.ones(nx)    # from previous time-step
+u = grid.zeros() + 1
 
 # Initial condition: hat function
 u[int(.5/dx):int(1/dx)+1]=2
 
-
-def advance(t_steps):
-    for n in range(0,t_steps): # loop over all time-steps
-        up = u.copy()
-        # with periodic BC all are internal points
-        u[1:] = up[1:] - up[1:]*dt/dx*(up[1:] - up[0:-1])
-        u[0] = up[0] - up[0]*dt/dx*(up[0] - up[-1])
-
-
-def plot2d(x_plot, u_plot):
-    fig = pyplot.figure(figsize=(5, 3), dpi=100)
-    pyplot.xlim(0,2)
-    pyplot.ylim(0,2.5)
-    pyplot.plot(x_plot, u_plot)
-    fig.show()
-
-
-# check initial condition
-#plot2d(x, u)
-
-def plot_multi(x, u):
-    fig = pyplot.figure(figsize=(7, 5), dpi=100)
-    colour = iter(cm.rainbow(numpy.linspace(0,25,nt)))
-    for i in range(0, nt, 25):
-        c = next(colour)
-        pyplot.plot(x,u, c=c)
-        advance(25)
-        pyplot.xlabel('x (m)')
-        pyplot.ylabel('u (m/s)')
-        pyplot.xlim(0, 2)
-        pyplot.ylim(0, 2.5)
-        pyplot.title('Non-linear convection')
-    pyplot.show()
+solver = cfd.NonlConv1D(grid, u, dt)
 
 # Let us plot some curves to check if everything is alright
-plot_multi(x, u)
+if cfl is None:
+    plotting.plot_multi(x, solver, nt, 25, 'Non-linear convection')
+else:
+    plotting.plot_line(x, solver.u)
+    plotting.plot_line(x, solver.advance_to(t_max, cfl).u)
+u = solver.u
+plotting.show()
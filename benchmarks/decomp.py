@@ -0,0 +1,52 @@
+# Strong and weak scaling of the domain-decomposed 2D convection-diffusion
+# (08) against the serial solver.
+#
+#   python -m benchmarks.decomp [n [nt [max workers]]]
+#
+# strong: n x n grid for 1 .. max workers
+# weak:   (n*workers) x n grid, i.e. n rows per worker
+import os
+import sys
+import time
+
+import cfd
+from cfd.decomp import Decomposed
+
+
+def setup(nx, ny):
+    grid = cfd.Grid2D(nx, ny)
+    u = grid.zeros() + 1
+    return cfd.ConvDiff2D(grid, u, u, .1, 1e-6, bc=1)
+
+
+def timed(solver, nt, workers):
+    if workers == 0:
+        solver.advance(1)
+        t = time.perf_counter()
+        solver.advance(nt)
+        return time.perf_counter() - t
+    with Decomposed(solver, workers) as par:
+        par.advance(1) # start-up
+        t = time.perf_counter()
+        par.advance(nt)
+        return time.perf_counter() - t
+
+
+def report(kind, nx, ny, nt, workers, t, t1):
+    print('%-6s %6d x %-6d workers %3d  %8.3g s/step  %9.3g cells/s  '
+          'speedup %5.2f  efficiency %4.2f'
+          % (kind, nx, ny, workers or 1, t/nt, nx*ny*nt/t, t1/t,
+             t1/t/(workers or 1) if kind == 'strong' else t1/t))
+
+
+if __name__ == '__main__':
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 4096
+    nt = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    nmax = int(sys.argv[3]) if len(sys.argv) > 3 else os.cpu_count()
+    counts = [w for w in (1, 2, 4, 8, 16, 32, 64) if w <= nmax]
+    t1 = timed(setup(n, n), nt, 0)
+    report('serial', n, n, nt, 0, t1, t1)
+    for w in counts:
+        report('strong', n, n, nt, w, timed(setup(n, n), nt, w), t1)
+    for w in counts:
+        report('weak', n*w, n, nt, w, timed(setup(n*w, n), nt, w), t1)
@@ -0,0 +1,70 @@
+# Throughput of the batched ensemble mode against a serial loop of runs,
+# in members*steps per second.
+#
+#   python -m benchmarks.ensemble [nbatch ...]
+#
+# Burgers (04) with a different nu per member, linear convection (01)
+# with a different c and hat per member, 2D convection-diffusion (08)
+# with a different nu per member.
+import sys
+import time
+
+import numpy
+
+import cfd
+
+
+def burgers(nbatch):
+    grid = cfd.Grid1D(151, 0, 2*numpy.pi)
+    nu = numpy.linspace(0.05, 0.15, nbatch)
+    dt = 0.5/150
+    u = cfd.sawtooth(grid.x, nu[:,None])
+    return 150, (lambda k: cfd.Burgers1D(grid, u[k], nu[k], dt),
+                 lambda: cfd.Burgers1D(grid, u, nu, dt))
+
+
+def lin_conv(nbatch):
+    grid = cfd.Grid1D(81, 0, 2)
+    c = numpy.linspace(0.5, 1., nbatch)
+    start = numpy.linspace(0.2, 0.8, nbatch)
+    x = grid.x
+    u = numpy.where((x >= start[:,None]) & (x <= start[:,None]+.5), 2., 0.)
+    dt = 0.025
+    return 75, (lambda k: cfd.LinConv1D(grid, u[k], c[k], dt),
+                lambda: cfd.LinConv1D(grid, u, c, dt))
+
+
+def conv_diff(nbatch):
+    grid = cfd.Grid2D(41, 41)
+    nu = numpy.linspace(0.005, 0.02, nbatch)
+    dt = 0.001
+    u = grid.zeros() + 1
+    u[int(.5/grid.dx):int(1/grid.dx+1), int(.5/grid.dy):int(1/grid.dy+1)] = 2
+    return 100, (lambda k: cfd.ConvDiff2D(grid, u, u, nu[k], dt),
+                 lambda: cfd.ConvDiff2D(grid, u, u, nu, dt))
+
+
+def run(case, nbatch):
+    nt, (member, ensemble) = case(nbatch)
+    member(0).advance(1) # imports and jit compilation, not timed
+    ensemble().advance(1)
+    t = time.perf_counter()
+    serial = [member(k).advance(nt).fields for k in range(nbatch)]
+    t_serial = time.perf_counter() - t
+    t = time.perf_counter()
+    batched = ensemble().advance(nt).fields
+    t_batched = time.perf_counter() - t
+    for k in range(nbatch):
+        for a, b in zip(serial[k], batched):
+            assert numpy.allclose(a, b[k], rtol=1e-12, atol=0)
+    rate = nbatch*nt
+    print('%-10s nbatch %5d  serial %10.3g  batched %10.3g  '
+          'members*steps/s  (x%.1f)'
+          % (case.__name__, nbatch, rate/t_serial, rate/t_batched,
+             t_serial/t_batched))
+
+
+if __name__ == '__main__':
+    for nbatch in [int(a) for a in sys.argv[1:]] or [16, 64, 256]:
+        for case in (burgers, lin_conv, conv_diff):
+            run(case, nbatch)
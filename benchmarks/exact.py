@@ -0,0 +1,41 @@
+# Error time series of a Burgers run (04) against the analytical solution:
+# cfd.anal_sol and the norms one time at a time against
+# cfd.burgers.Exact.errors, all times in one broadcast.
+#
+#   python -m benchmarks.exact [nx]
+import sys
+import time
+
+import numpy
+
+import cfd
+from cfd.burgers import Exact
+
+NU = .1
+
+
+def loop(x, u, ts):
+    dx = x[1] - x[0]
+    out = []
+    for k, t in enumerate(ts):
+        e = numpy.abs(u[k] - cfd.anal_sol(x, t, NU))
+        out.append((t, dx*e.sum(), numpy.sqrt(dx*(e**2).sum()), e.max()))
+    return numpy.array(out)
+
+
+if __name__ == '__main__':
+    nx = int(sys.argv[1]) if len(sys.argv) > 1 else 2001
+    grid = cfd.Grid1D(nx, 0, 2*numpy.pi)
+    for nt in (10, 100, 1000, 5000):
+        ts = numpy.linspace(0, .5, nt)
+        u = cfd.sawtooth(grid.x, NU) + numpy.zeros((nt, 1)) # stand-in series
+        t = time.perf_counter()
+        ref = loop(grid.x, u, ts)
+        t1 = time.perf_counter() - t
+        t = time.perf_counter()
+        err = Exact(grid.x, NU).errors(u, ts)
+        t2 = time.perf_counter() - t
+        diff = max(numpy.abs(err[k] - ref[:,i]).max()
+                   for i, k in enumerate(err.dtype.names))
+        print('nx %6d  %5d times  loop %8.3g s  batched %8.3g s  x%5.1f  '
+              'max diff %.1e' % (nx, nt, t1, t2, t1/t2, diff))
@@ -0,0 +1,36 @@
+# Fused (numba) against numpy 2D convection-diffusion (08) update.
+#
+#   python -m benchmarks.fused [n ...]
+import sys
+import time
+
+import numpy
+
+import cfd
+from cfd import fused
+from cfd.sweep import hat
+
+
+def run(n, nt=20, nu=.1):
+    grid = cfd.Grid2D(n, n)
+    dt = 0.2*grid.dx**2/nu
+    times, fields = [], []
+    for f in (False, True):
+        solver = cfd.ConvDiff2D(grid, hat(grid, 1), hat(grid, 1), nu, dt,
+                                fused=f)
+        solver.advance(1) # jit compilation
+        t = time.perf_counter()
+        solver.advance(nt)
+        times.append((time.perf_counter() - t)/nt)
+        fields.append(solver.fields)
+    same = all(numpy.array_equal(a, b) for a, b in zip(*fields))
+    print('%5d^2  numpy %9.3g s/step  fused %9.3g s/step  x%5.1f  %s'
+          % (n, times[0], times[1], times[0]/times[1],
+             'identical' if same else 'DIFFERENT'))
+
+
+if __name__ == '__main__':
+    if not fused.available():
+        sys.exit('numba is not installed')
+    for n in [int(a) for a in sys.argv[1:]] or [51, 256, 1024, 4096]:
+        run(n)
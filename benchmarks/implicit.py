@@ -0,0 +1,62 @@
+# Time to tmax of implicit against explicit diffusion.
+#
+#   python -m benchmarks.implicit [nx ...]
+#
+# 1D (03): a sine mode on the periodic ring, explicit Euler at its stable
+# limit dt = dx**2/(2*nu) against Crank-Nicolson with a fixed number of
+# steps; the error is against the exact decay of the discrete mode.
+# 2D (07): the sine mode between the Dirichlet walls u = v = 1, explicit
+# Euler at dt = dx**2/(4*nu) against Peaceman-Rachford ADI.
+import sys
+import time
+
+import numpy
+
+import cfd
+
+NU, TMAX = .1, .5
+
+
+def timed(solver, nt):
+    t = time.perf_counter()
+    solver.advance(nt)
+    return time.perf_counter() - t
+
+
+def diffusion1d(nx, ntcn=50):
+    grid = cfd.Grid1D(nx, 0, 2)
+    k = 2*numpy.pi/(2 + grid.dx) # nx points on the ring
+    u0 = 1 + numpy.sin(k*grid.x)
+    lam = 2*(numpy.cos(k*grid.dx) - 1)/grid.dx**2
+    exact = 1 + numpy.exp(NU*lam*TMAX)*numpy.sin(k*grid.x)
+    for scheme, nt in (('euler', int(numpy.ceil(2*NU*TMAX/grid.dx**2))),
+                       ('cn', ntcn)):
+        solver = cfd.Diffusion1D(grid, u0, NU, TMAX/nt)
+        solver.scheme = scheme
+        t = timed(solver, nt)
+        print('1D %6d  %-6s %7d steps %9.3g s  error %.2e'
+              % (nx, scheme, nt, t, numpy.abs(solver.u - exact).max()))
+
+
+def diffusion2d(n, ntadi=50):
+    grid = cfd.Grid2D(n, n)
+    x, y = grid.meshgrid()
+    mode = numpy.sin(numpy.pi*x/2)*numpy.sin(numpy.pi*y/2)
+    lam = 2*(numpy.cos(numpy.pi*grid.dx/2) - 1)/grid.dx**2 + \
+          2*(numpy.cos(numpy.pi*grid.dy/2) - 1)/grid.dy**2
+    exact = 1 + numpy.exp(NU*lam*TMAX)*mode
+    for scheme, nt in (('euler', int(numpy.ceil(4*NU*TMAX/grid.dx**2))),
+                       ('adi', ntadi)):
+        solver = cfd.Diffusion2D(grid, 1 + mode, 1 + mode, NU, TMAX/nt)
+        solver.scheme = scheme
+        t = timed(solver, nt)
+        print('2D %6d^2 %-6s %6d steps %9.3g s  error %.2e'
+              % (n, scheme, nt, t, numpy.abs(solver.u - exact).max()))
+
+
+if __name__ == '__main__':
+    sizes = [int(a) for a in sys.argv[1:]]
+    for nx in sizes or [51, 201, 801, 3201]:
+        diffusion1d(nx)
+    for n in sizes or [51, 101, 201, 401]:
+        diffusion2d(n)
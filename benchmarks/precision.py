@@ -0,0 +1,80 @@
+# float32 against float64: accuracy, throughput and memory.
+#
+#   python -m benchmarks.precision [n ...]
+#
+# Stepping: the 2D solvers of cfd.sweep on n x n at half the stable dt,
+# the same run with float32 fields; the error is max|f32 - f64| over the
+# fields relative to their range, the memory that of the solver's buffers.
+# Elliptic: poisson2d (10's two point sources) to a relative L1 residual
+# of 1e-9 in float64, in float32 throughout (stalls at its rounding
+# floor) and mixed (float32 sweeps / V-cycles, float64 residual
+# correction); the error is max|p - p64| relative to max|p64|.
+import sys
+import time
+
+import numpy
+
+import cfd
+from cfd import sweep
+
+STEPS = 20
+
+
+def nbytes(solver):
+    arrays = solver.cur + solver.nxt + solver.work + \
+             sum(getattr(solver, 'stages', []), [])
+    return sum(a.nbytes for a in arrays)
+
+
+def stepping(case, n):
+    dt = 0.5*float(numpy.min(sweep.CASES[case](nx=n)[1].stable_dt()))
+    runs = []
+    for dtype in (numpy.float64, numpy.float32):
+        solver = sweep.CASES[case](nx=n, dtype=dtype)[1]
+        solver.dt = dt
+        solver.advance(1)
+        t = time.perf_counter()
+        solver.advance(STEPS)
+        runs.append(((time.perf_counter() - t)/STEPS, nbytes(solver),
+                     solver.fields))
+    (t64, m64, f64), (t32, m32, f32) = runs
+    err = max(numpy.abs(a - b).max()/(numpy.ptp(a) or 1)
+              for a, b in zip(f64, f32))
+    print('%-12s %5d^2  f64 %8.3g s/step  f32 %8.3g s/step  x%4.2f  '
+          'memory %6.1f -> %6.1f MB  error %.1e'
+          % (case, n, t64, t32, t64/t32, m64/2**20, m32/2**20, err))
+
+
+def elliptic(method, n, tol=1e-9):
+    grid = cfd.Grid2D(n, n, 0, 2, 0, 1)
+    b = grid.zeros()
+    b[n//4, n//4] = 100
+    b[3*n//4, 3*n//4] = -100
+    maxiter = 10000 if method == 'sor' else 100
+    res = []
+    for label, pdtype, dtype in (('float64', float, None),
+                                 ('float32', numpy.float32, None),
+                                 ('mixed', float, numpy.float32)):
+        p = grid.zeros(pdtype)
+        info = {}
+        cfd.poisson2d(p, p.copy(), b.astype(pdtype), grid.dx, grid.dy,
+                      maxiter, method=method, tol=tol, info=info,
+                      dtype=dtype)
+        res.append((label, p, info))
+    p64 = res[0][1]
+    for label, p, info in res:
+        print('%-10s %5d^2  %-8s %7d it %8.3g s  residual %.1e  error %.1e'
+              % (method, n, label, info['iterations'], info['time'],
+                 info.get('residual', numpy.nan),
+                 numpy.abs(p - p64).max()/numpy.abs(p64).max()))
+
+
+if __name__ == '__main__':
+    sizes = [int(a) for a in sys.argv[1:]]
+    for n in sizes or [512, 1024, 2048]:
+        for case in sweep.CASES:
+            stepping(case, n)
+    for n in sizes or [129, 513]:
+        elliptic('multigrid', n)
+    for n in sizes[:1] or [65]:
+        elliptic('sor', n)
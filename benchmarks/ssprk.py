@@ -0,0 +1,124 @@
+# Cost against error of the time integration schemes for Burgers (04):
+# error against cfd.anal_sol at tmax, number of steps and wall time.
+#
+#   python -m benchmarks.ssprk [nx] [--targets 1e-3,1e-5,1e-7]
+#
+# The total error also holds the error of the first-order upwind space
+# discretization, which no time integrator removes: against anal_sol it
+# dominates on these grids and is the same for every scheme. The time
+# error is therefore measured against an ssprk3 run on the same grid
+# with a step 80 times smaller than the stable one, 20 times smaller
+# than the finest run.
+#
+# First table: the errors at fixed nt, 1, 2 and 4 times the fewest
+# stable steps. Second table: for each target time error, the fewest
+# steps (within 5%) and the wall time each scheme needs to reach it,
+# found by doubling nt from the stable limit, then bisection; a scheme
+# that needs more than --maxsteps times the stable limit is reported
+# as not reaching the target.
+import argparse
+import time
+
+import numpy
+
+import cfd
+
+SCHEMES = ('euler', 'ssprk2', 'ssprk3')
+
+
+def run(grid, nu, tmax, nt, scheme):
+    solver = cfd.Burgers1D(grid, cfd.sawtooth(grid.x, nu), nu, tmax/nt)
+    solver.scheme = scheme
+    t = time.perf_counter()
+    solver.advance(nt)
+    return solver.u, time.perf_counter() - t
+
+
+def error(u, ref):
+    return numpy.abs(u - ref).max()
+
+
+def steps_to(measure, target, nt0, ntmax, rtol=0.05):
+    """Fewest steps from nt0 (to within rtol) whose time error is at most
+    target, as (nt, seconds, error); measure(nt) returns the seconds and
+    error of a run. nt is None, with the error of ntmax steps, if ntmax
+    steps do not reach it."""
+    lo, nt = None, nt0
+    while True:
+        t, e = measure(nt)
+        if e <= target:
+            break
+        if nt >= ntmax:
+            return None, t, e
+        lo, nt = nt, min(2*nt, ntmax)
+    best = nt, t, e
+    hi = nt
+    while lo is not None and hi - lo > rtol*hi:
+        mid = (lo + hi)//2
+        t, e = measure(mid)
+        if e <= target:
+            hi, best = mid, (mid, t, e)
+        else:
+            lo = mid
+    return best
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(prog='python -m benchmarks.ssprk')
+    p.add_argument('nx', type=int, nargs='?', default=1201)
+    p.add_argument('--targets', default='1e-2,1e-3,1e-5,1e-7',
+                   help='time errors to reach, comma separated')
+    p.add_argument('--maxsteps', type=int, default=64,
+                   help='largest nt searched, in stable limits')
+    a = p.parse_args(argv)
+    nu, tmax = .1, .5
+    grid = cfd.Grid1D(a.nx, 0, 2*numpy.pi)
+    exact = cfd.anal_sol(grid.x, tmax, nu)
+    probe = cfd.Burgers1D(grid, cfd.sawtooth(grid.x, nu), nu, 1.)
+    ntmin = int(numpy.ceil(tmax/float(numpy.min(probe.stable_dt()))))
+    fine = run(grid, nu, tmax, 20*4*ntmin, 'ssprk3')[0]
+    print('nx %d, stable for nt >= %d; errors max|.|' % (a.nx, ntmin))
+    print('%-7s %7s %10s %12s %12s' % ('scheme', 'nt', 'time s', 'time error',
+                                      'total error'))
+    for scheme in SCHEMES:
+        for k in (1, 2, 4):
+            u, t = run(grid, nu, tmax, k*ntmin, scheme)
+            print('%-7s %7d %10.3g %12.3g %12.3g'
+                  % (scheme, k*ntmin, t, error(u, fine), error(u, exact)))
+    if not a.targets:
+        return
+    ntmax = a.maxsteps*ntmin
+    runs = {}
+    def measure(scheme):
+        def m(nt):
+            if (scheme, nt) not in runs:
+                u, t = run(grid, nu, tmax, nt, scheme)
+                runs[scheme, nt] = t, error(u, fine)
+            return runs[scheme, nt]
+        return m
+    print()
+    print('steps and time to a time error, against euler (> : euler did '
+          'not reach it in %d steps)' % ntmax)
+    print('%-7s %9s %9s %10s %12s %16s'
+          % ('scheme', 'target', 'nt', 'time s', 'time error',
+             'fewer nt, less s'))
+    for target in sorted(map(float, a.targets.split(',')), reverse=True):
+        base = None
+        for scheme in SCHEMES:
+            nt, t, e = steps_to(measure(scheme), target, ntmin, ntmax)
+            if scheme == 'euler':
+                base = (ntmax, t, '>') if nt is None else (nt, t, '')
+            if nt is None:
+                print('%-7s %9.1e %9s %10s %12.3g %16s'
+                      % (scheme, target, '>%d' % ntmax, '-', e,
+                         'not reached'))
+                continue
+            ratio = '-' if scheme == 'euler' else \
+                    '%sx%.1f, %sx%.1f' % (base[2], base[0]/nt, base[2],
+                                          base[1]/t)
+            print('%-7s %9.1e %9d %10.3g %12.3g %16s'
+                  % (scheme, target, nt, t, e, ratio))
+
+
+if __name__ == '__main__':
+    main()
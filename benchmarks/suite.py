@@ -0,0 +1,181 @@
+# Throughput of the kernels over a ladder of grid sizes, with a JSON
+# record of the results and a regression check against a saved one.
+#
+#   python -m benchmarks.suite -o base.json                 # baseline
+#   python -m benchmarks.suite --baseline base.json -o new.json
+#   python -m benchmarks.suite -n 64,256,1024 -c conv_diff2d,poisson2d
+#
+# Cases are the 2D solvers of cfd.sweep (advance() at half the stable dt)
+# and the elliptic solvers as 'laplace2d:<method>', 'poisson2d:<method>'.
+# They run to their target and count sweeps / V-cycles, the Jacobi
+# sweeps are capped so that every size gets about BUDGET cell updates per
+# timing (poisson2d jacobi does exactly that many). The best of --repeat
+# timings is kept. Peak memory is measured in a separate run with
+# tracemalloc (which sees numpy's allocations), it includes the fields of
+# the case.
+#
+# A result is flagged if its cell updates per second dropped, or its peak
+# memory grew, by more than --tolerance against the baseline. The exit
+# status is 1 if any result was flagged.
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+import numpy
+
+import cfd
+from cfd import fused, sweep
+
+SIZES = (64, 128, 256, 512, 1024, 2048, 4096)
+CASES = ('lin_conv2d', 'nonl_conv2d', 'diffusion2d', 'conv_diff2d',
+         'laplace2d:jacobi', 'laplace2d:multigrid', 'poisson2d:jacobi',
+         'poisson2d:multigrid')
+BUDGET = 2e7  # cell updates per timing
+MAXSTEPS = 1000
+
+
+# Cases: setup(n) returns run(), which returns the iterations it did
+##############################
+def advance(case, n):
+    nt = int(min(MAXSTEPS, max(1, BUDGET//n**2)))
+    solver = sweep.CASES[case](nx=n)[1]
+    solver.dt = 0.5*float(numpy.min(solver.stable_dt()))
+    solver.advance(1) # first-touch of the buffers (and jit compilation)
+    def run():
+        solver.advance(nt)
+        return nt
+    return run
+
+
+def laplace2d(method, n):
+    grid = cfd.Grid2D(n, n, 0, 2, 0, 1)
+    p0 = grid.zeros()
+    p0[-1,:] = grid.y
+    maxiter = int(min(MAXSTEPS, max(1, BUDGET//n**2))) \
+              if method == 'jacobi' else None
+    def run():
+        info = {}
+        cfd.laplace2d(p0.copy(), grid.y, grid.dx, grid.dy, 1e-4,
+                      method=method, info=info, maxiter=maxiter)
+        return info['iterations']
+    return run
+
+
+def poisson2d(method, n):
+    grid = cfd.Grid2D(n, n, 0, 2, 0, 1)
+    b = grid.zeros()
+    b[n//4, n//4] = 100
+    b[3*n//4, 3*n//4] = -100
+    steps = int(min(MAXSTEPS, max(1, BUDGET//n**2))) if method == 'jacobi' \
+            else 100
+    def run():
+        info = {}
+        p = grid.zeros()
+        cfd.poisson2d(p, p.copy(), b, grid.dx, grid.dy, steps, method=method,
+                      info=info)
+        return info['iterations']
+    return run
+
+
+def setup(case, n):
+    kernel, _, method = case.partition(':')
+    if kernel == 'laplace2d':
+        return laplace2d(method or 'multigrid', n)
+    if kernel == 'poisson2d':
+        return poisson2d(method or 'jacobi', n)
+    if kernel in sweep.CASES:
+        return advance(kernel, n)
+    raise ValueError('unknown case %r' % case)
+
+
+# Measurement
+##############################
+def measure(case, n, repeat=3):
+    run = setup(case, n)
+    best = numpy.inf
+    for i in range(repeat):
+        t = time.perf_counter()
+        it = run()
+        best = min(best, time.perf_counter() - t)
+    del run
+    tracemalloc.start()
+    setup(case, n)()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {'case': case, 'n': n, 'iterations': it, 'time': best,
+            'time_per_it': best/it, 'cell_updates': n*n*it/best,
+            'peak_mb': peak/2**20}
+
+
+def machine():
+    return {'date': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'python': platform.python_version(), 'numpy': numpy.__version__,
+            'numba': fused.available(), 'platform': platform.platform(),
+            'processor': platform.processor(), 'cpus': os.cpu_count()}
+
+
+def compare(results, baseline, tolerance):
+    """The results that are slower, or need more memory, than their
+    baseline by more than tolerance, as (result, speed ratio, memory
+    ratio)."""
+    base = {(r['case'], r['n']): r for r in baseline['results']}
+    flagged = []
+    for r in results:
+        b = base.get((r['case'], r['n']))
+        if b is None:
+            continue
+        speed = r['cell_updates']/b['cell_updates']
+        memory = r['peak_mb']/b['peak_mb'] if b['peak_mb'] else 1
+        r['speed_ratio'], r['memory_ratio'] = speed, memory
+        if speed < 1 - tolerance or memory > 1 + tolerance:
+            flagged.append((r, speed, memory))
+    return flagged
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(prog='python -m benchmarks.suite')
+    p.add_argument('-n', '--sizes', default=','.join(map(str, SIZES)),
+                   help='grid sizes n (n x n cells), comma separated')
+    p.add_argument('-c', '--cases', default=','.join(CASES))
+    p.add_argument('-r', '--repeat', type=int, default=3)
+    p.add_argument('-o', '--output', help='write the results to this JSON')
+    p.add_argument('-b', '--baseline', help='JSON of an earlier run')
+    p.add_argument('-t', '--tolerance', type=float, default=0.1)
+    a = p.parse_args(argv)
+    baseline = None
+    if a.baseline:
+        with open(a.baseline) as f:
+            baseline = json.load(f)
+    results = []
+    print('%-22s %6s %8s %12s %14s %10s' % ('case', 'n', 'iters', 's/iter',
+                                            'cell upd/s', 'peak MB'))
+    for case in a.cases.split(','):
+        for n in map(int, a.sizes.split(',')):
+            r = measure(case, n, a.repeat)
+            results.append(r)
+            line = '%-22s %6d %8d %12.3g %14.3g %10.1f' % (
+                case, n, r['iterations'], r['time_per_it'],
+                r['cell_updates'], r['peak_mb'])
+            if baseline is not None and compare([r], baseline, a.tolerance):
+                line += '  REGRESSION x%.2f speed x%.2f memory' % (
+                    r['speed_ratio'], r['memory_ratio'])
+            elif 'speed_ratio' in r:
+                line += '  x%.2f speed' % r['speed_ratio']
+            print(line, flush=True)
+    if a.output:
+        with open(a.output, 'w') as f:
+            json.dump({'machine': machine(), 'results': results}, f, indent=1)
+    if baseline is not None:
+        flagged = compare(results, baseline, a.tolerance)
+        print('%d of %d results regressed by more than %g%% against %s'
+              % (len(flagged), len(results), 100*a.tolerance, a.baseline))
+        return 1 if flagged else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,81 @@
+# Memory and throughput of the 3D solvers.
+#
+#   python -m benchmarks.threed [-n 128,256] [-j threads] [--float32]
+#
+# The fields start from scalars (so the caller holds no copy), the hat of
+# the scripts is set in place. Peak memory is traced from the constructor
+# to the end of the run and given in copies of the state (u, v, w); the
+# "copy per step" line is the update written as in the 2D scripts
+# (fn = fo.copy(), whole-array expressions) for comparison.
+import argparse
+import os
+import time
+import tracemalloc
+
+import numpy
+
+import cfd
+
+STEPS = 5
+CASES = {'lin_conv3d': lambda g, f, dt: cfd.LinConv3D(g, f, f, f, 1., dt),
+         'diffusion3d': lambda g, f, dt: cfd.Diffusion3D(g, f, f, f, .1, dt),
+         'conv_diff3d': lambda g, f, dt: cfd.ConvDiff3D(g, f, f, f, .1, dt)}
+
+
+def hat(f, grid):
+    f[int(.5/grid.dx):int(1/grid.dx)+1, int(.5/grid.dy):int(1/grid.dy)+1,
+      int(.5/grid.dz):int(1/grid.dz)+1] = 2
+
+
+def run(case, n, dtype, threads):
+    grid = cfd.Grid3D(n, n, n)
+    tracemalloc.start()
+    solver = CASES[case](grid, dtype(1), 1.)
+    for f in solver.fields:
+        hat(f, grid)
+    solver.dt = 0.5*float(numpy.min(solver.stable_dt()))
+    solver.threads = threads
+    solver.advance(1)
+    t = time.perf_counter()
+    solver.advance(STEPS)
+    t = (time.perf_counter() - t)/STEPS
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return t, peak/(3*n**3*numpy.dtype(dtype).itemsize)
+
+
+def copy_per_step(n, dtype):
+    # LinConv3D as 05 writes it, u, v, w copied every step
+    grid = cfd.Grid3D(n, n, n)
+    tracemalloc.start()
+    fields = [numpy.ones(grid.shape, dtype) for i in range(3)]
+    dt = 0.5/(1/grid.dx + 1/grid.dy + 1/grid.dz)
+    I = (slice(1, -1),)*3
+    for n_ in range(2):
+        old = [f.copy() for f in fields]
+        for f, fo in zip(fields, old):
+            f[I] = fo[I] - dt/grid.dx*(fo[I] - fo[:-2,1:-1,1:-1]) - \
+                   dt/grid.dy*(fo[I] - fo[1:-1,:-2,1:-1]) - \
+                   dt/grid.dz*(fo[I] - fo[1:-1,1:-1,:-2])
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak/(3*n**3*numpy.dtype(dtype).itemsize)
+
+
+if __name__ == '__main__':
+    p = argparse.ArgumentParser(prog='python -m benchmarks.threed')
+    p.add_argument('-n', '--sizes', default='128,256')
+    p.add_argument('-j', '--threads', type=int, default=os.cpu_count())
+    p.add_argument('--float32', action='store_true')
+    a = p.parse_args()
+    dtype = numpy.float32 if a.float32 else numpy.float64
+    for n in map(int, a.sizes.split(',')):
+        print('%-12s %4d^3  peak %.2f x state' % ('copy per step', n,
+                                                 copy_per_step(n, dtype)))
+        for case in CASES:
+            t1, m1 = run(case, n, dtype, 1)
+            tj, mj = run(case, n, dtype, a.threads)
+            print('%-12s %4d^3  %8.3f s/step  %d threads %8.3f s/step  '
+                  '%.3g cell upd/s  peak %.2f / %.2f x state'
+                  % (case, n, t1, a.threads, tj, n**3/min(t1, tj), m1, mj),
+                  flush=True)
@@ -0,0 +1,44 @@
+# Cache-blocked (tiled) against whole-array execution of the 2D kernels.
+#
+#   python -m benchmarks.tiling [n ...]
+#
+# advance() of the 2D solvers of cfd.sweep on n x n at half the stable dt
+# with solver.tile = 0 (every numpy operation over the whole field) and
+# the default cache-sized strips (cfd/tiling.py); conv_diff2d on its
+# numpy path. The results must be identical.
+import sys
+import time
+
+import numpy
+
+from cfd import sweep, tiling
+
+STEPS = 10
+
+
+def run(case, n, tile):
+    solver = sweep.CASES[case](nx=n)[1]
+    solver.dt = 0.5*float(numpy.min(solver.stable_dt()))
+    solver.fused = False
+    solver.tile = tile
+    solver.advance(1)
+    best = numpy.inf
+    for i in range(3):
+        t = time.perf_counter()
+        solver.advance(STEPS)
+        best = min(best, (time.perf_counter() - t)/STEPS)
+    return best, solver
+
+
+if __name__ == '__main__':
+    print('cache %d KB per strip' % (tiling.CACHE//1024))
+    for n in [int(a) for a in sys.argv[1:]] or [2048, 4096]:
+        for case in sweep.CASES:
+            t0, s0 = run(case, n, 0)
+            t1, s1 = run(case, n, None)
+            same = all(numpy.array_equal(a, b)
+                       for a, b in zip(s0.fields, s1.fields))
+            print('%-12s %5d^2  whole %8.4f s/step  tiled %8.4f s/step '
+                  '(%3d rows)  x%4.2f  %.3g cell upd/s  %s'
+                  % (case, n, t0, t1, s1.tiles()[1], t0/t1, n*n/t1,
+                     'identical' if same else 'DIFFERENT'), flush=True)
@@ -0,0 +1,18 @@
+# Numerics of the 12 steps to Navier-Stokes scripts as an importable
+# package. Importing it only pulls in numpy; the matplotlib helpers live in
+# cfd.plotting and are loaded on first access.
+import importlib
+
+from .grid import Grid1D, Grid2D, Grid3D
+from .solver import (Solver, LinConv1D, NonlConv1D, Diffusion1D, Burgers1D,
+                     Solver2D, LinConv2D, NonlConv2D, Diffusion2D, ConvDiff2D,
+                     Solver3D, LinConv3D, Diffusion3D, ConvDiff3D)
+from .elliptic import laplace2d, poisson2d
+from .burgers import sawtooth, anal_sol
+from .metrics import Metrics
+
+
+def __getattr__(name):
+    if name == 'plotting':
+        return importlib.import_module('.plotting', __name__)
+    raise AttributeError("module %r has no attribute %r" % (__name__, name))
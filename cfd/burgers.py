@@ -0,0 +1,102 @@
+import numpy
+
+######################################################################
+# BURGERS EQUATION: SAW TOOTH INITIAL CONDITION, ANALYTICAL SOLUTION #
+######################################################################
+
+
+def sawtooth(x, nu):
+    phi = numpy.exp(-x**2/(4*nu)) + numpy.exp(-(x-2*numpy.pi)**2/(4*nu))
+    dphi = - 0.5*x/nu * numpy.exp(-x**2/(4*nu)) - 0.5*(x-2*numpy.pi)/nu * numpy.exp(-(x-2*numpy.pi)**2/(4*nu))
+
+    return -2*nu*dphi/phi + 4
+
+
+def anal_sol(x, t, nu):
+    phi2 = numpy.exp(-(x-4*t)**2/(4*nu*(t+1))) + numpy.exp(-(x-4*t-2*numpy.pi)**2/(4*nu*(t+1)))
+    dphi2 = - 0.5*(x-4*t)/(nu*(t+1)) * numpy.exp(-(x-4*t)**2/(4*nu*(t+1))) - 0.5*(x-4*t-2*numpy.pi)/(nu*(t+1)) *\
+            numpy.exp(-(x-4*t-2*numpy.pi)**2/(4*nu*(t+1)))
+    u_anal = -2*nu*dphi2/phi2 + 4
+
+    return u_anal
+
+
+# Many times at once
+##############################
+# With s = x - 4t the two exponentials of anal_sol differ by the factor
+# exp(pi*(pi - s)/(nu*(t+1))), which turns its quotient into
+#   u = 4 + (pi*tanh(k*w) - w)/(t+1),  w = pi - x + 4t,  k = pi/(2nu(t+1))
+# the same function with one tanh per point instead of four exp, and no
+# 0/0 where the exponentials underflow (small nu, late t).
+
+class Exact(object):
+    """Analytical solution on the points x for viscosity nu (a scalar, or
+    an array of one value per ensemble member): exact(t) evaluates it for
+    a scalar or an array of times in one broadcast, shape
+    t.shape + nu.shape + x.shape. The last evaluation is cached."""
+
+    def __init__(self, x, nu):
+        self.x = numpy.asarray(x, dtype=float)
+        self.dx = self.x[1] - self.x[0]
+        nu = numpy.asarray(nu, dtype=float)
+        self.nu = nu.reshape(nu.shape + (1,)*self.x.ndim)
+        self.px = numpy.pi - self.x # the time-independent part of w
+        self.cache = (None, None)
+
+    def evaluate(self, t):
+        t = numpy.asarray(t, dtype=float)
+        t = t.reshape(t.shape + (1,)*self.nu.ndim)
+        shape = numpy.broadcast_shapes(t.shape, self.nu.shape, self.x.shape)
+        w = numpy.add(self.px, 4*t, out=numpy.empty(shape)) # w = pi - x + 4t
+        u = numpy.multiply(numpy.pi/(2*self.nu*(t+1)), w)
+        numpy.tanh(u, out=u)
+        u *= numpy.pi
+        u -= w
+        u *= 1/(t+1)
+        u += 4
+        return u
+
+    def __call__(self, t):
+        key = numpy.shape(t), numpy.asarray(t, dtype=float).tobytes()
+        if self.cache[0] != key:
+            u = self.evaluate(t)
+            u.flags.writeable = False
+            self.cache = (key, u)
+        return self.cache[1]
+
+    def errors(self, u, t, block=2**17):
+        """L1, L2 and Linf norms of u - exact(t) over x for the series u
+        (ntimes, ..., nx) at the times t, as a structured array (t, l1,
+        l2, linf) of shape (ntimes, ...). L1 and L2 are scaled with dx.
+        u is read in blocks of about `block` values (memory-mapped
+        snapshots are read once)."""
+        t = numpy.asarray(t, dtype=float)
+        shape = numpy.broadcast_shapes(numpy.shape(u)[1:-1],
+                                       self.nu.shape[:-1])
+        out = numpy.zeros((len(t),) + shape,
+                          [('t', float), ('l1', float), ('l2', float),
+                           ('linf', float)])
+        out['t'] = t.reshape(t.shape + (1,)*len(shape))
+        step = max(1, block//max(1, int(numpy.prod(numpy.shape(u)[1:]))))
+        def lift(a): # (times, ..., nx) to (times, *shape, nx)
+            return a.reshape(a.shape[:1] + (1,)*(len(shape)+2-a.ndim) +
+                             a.shape[1:])
+        for k in range(0, len(t), step):
+            uk, e = lift(u[k:k+step]), lift(self.evaluate(t[k:k+step]))
+            e = numpy.subtract(uk, e, out=e if e.shape[1:] == (shape +
+                               uk.shape[-1:]) else None)
+            numpy.abs(e, out=e)
+            out['linf'][k:k+step] = e.max(axis=-1)
+            out['l1'][k:k+step] = self.dx*e.sum(axis=-1)
+            numpy.square(e, out=e)
+            out['l2'][k:k+step] = numpy.sqrt(self.dx*e.sum(axis=-1))
+        return out
+
+
+def errors(snaps, nu, name='u', block=2**17):
+    """Error time series of a 1D snapshot directory (or snapshots.Snapshots)
+    of a Burgers run against the analytical solution, see Exact.errors."""
+    from . import snapshots
+    if isinstance(snaps, str):
+        snaps = snapshots.load(snaps)
+    return Exact(snaps.grid.x, nu).errors(snaps[name], snaps.t, block)
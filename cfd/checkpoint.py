@@ -0,0 +1,120 @@
+import glob
+import json
+import os
+import tempfile
+import time
+
+import numpy
+
+from . import fused, grid as _grid, solver as _solver
+
+######################################################################
+# CHECKPOINT / RESTART                                               #
+######################################################################
+# A checkpoint is one uncompressed .npz file with the complete state of a
+# solver: its current fields, t, n, dt, the parameters (c, nu, ... as
+# given, arrays for ensembles), the remaining settings (bc, scheme, ...)
+# and the grid. The other buffers (ping-pong partner, work and stage
+# arrays) are overwritten by the next step before they are read, so a
+# solver restored from a checkpoint continues bit-for-bit like the one
+# that wrote it.
+#
+# Files are written to a temporary file in the same directory, synced
+# and renamed (atomic on POSIX), a pre-empted run never leaves a
+# truncated checkpoint behind. run() keeps the `keep` most recent
+# checkpoints of a directory, named by step count.
+#
+#   solver = checkpoint.resume('ckpt08') or cfd.ConvDiff2D(...)
+#   checkpoint.run(solver, nt, 'ckpt08', seconds=600)
+
+# not saved: the buffers, what the constructor derives again (dtype from
+# the fields) and the instrumentation
+BUFFERS = ('grid', 'cur', 'nxt', 'work', 'stages', 'plane', 'strips', 'pool',
+           'batch', 'params', 'dtype', 'metrics')
+
+
+def save(solver, path):
+    """Write the state of solver to path atomically."""
+    nd = len(solver.grid.shape)
+    gname, gargs = _grid.describe(solver.grid)
+    state = {'class': type(solver).__name__, 'grid': gname,
+             'grid_args': gargs, 'params': list(solver.params), 'attrs': {}}
+    arrays = {'fields': numpy.array(solver.fields)}
+    for name, value in vars(solver).items():
+        if name in BUFFERS:
+            continue
+        if numpy.ndim(value):
+            if name in solver.params or name == 'dt':
+                value = value.reshape(value.shape[:value.ndim-nd])
+            arrays['attr_' + name] = value
+        else:
+            state['attrs'][name] = value.item() if hasattr(value, 'item') \
+                                   else value
+    arrays['state'] = numpy.array(json.dumps(state))
+    folder = os.path.dirname(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(dir=folder, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            numpy.savez(f, **arrays)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+    return path
+
+
+def load(path):
+    """Rebuild the solver saved in path."""
+    with numpy.load(path) as f:
+        state = json.loads(str(f['state']))
+        fields = f['fields']
+        attrs = dict(state['attrs'])
+        attrs.update((k[5:], f[k]) for k in f.files if k.startswith('attr_'))
+    grid = _grid.rebuild(state['grid'], state['grid_args'])
+    cls = getattr(_solver, state['class'])
+    solver = cls.__new__(cls)
+    if 'bc' in attrs: # sets the layout of the buffers (ghost cells)
+        solver.bc = attrs['bc']
+    _solver.Solver.__init__(solver, grid, attrs.pop('dt'), *fields,
+                            **{k: attrs.pop(k) for k in state['params']})
+    if attrs.get('fused'):
+        # written with numba, read without: the numpy path, same results
+        attrs['fused'] = fused.supports(solver.dtype, solver.dt,
+                                        *[getattr(solver, k)
+                                          for k in solver.params])
+    for name, value in attrs.items():
+        setattr(solver, name, value)
+    return solver
+
+
+def latest(folder):
+    files = sorted(glob.glob(os.path.join(folder, 'ckpt_*.npz')))
+    return files[-1] if files else None
+
+
+def resume(folder):
+    """The solver of the latest checkpoint in folder, None if there is
+    none."""
+    path = latest(folder)
+    return None if path is None else load(path)
+
+
+def run(solver, nt, folder, every=None, seconds=None, keep=2):
+    """Advance solver up to step count nt (a resumed solver continues from
+    its n) and checkpoint it into folder every `every` steps and/or every
+    `seconds` of wall time, and at the end."""
+    os.makedirs(folder, exist_ok=True)
+    last = time.perf_counter()
+    while solver.n < nt:
+        solver.advance(1)
+        if (every and solver.n % every == 0) or \
+                (seconds and time.perf_counter() - last >= seconds) or \
+                solver.n == nt:
+            save(solver, os.path.join(folder, 'ckpt_%010d.npz' % solver.n))
+            for old in sorted(glob.glob(os.path.join(folder,
+                                                     'ckpt_*.npz')))[:-keep]:
+                os.unlink(old)
+            last = time.perf_counter()
+    return solver
@@ -0,0 +1,107 @@
+import time
+
+import numpy
+
+######################################################################
+# CONVERGENCE MONITORING OF THE ITERATIVE ELLIPTIC SOLVERS           #
+######################################################################
+# A Monitor decides when an iteration stops. It measures the residual
+# r = b - Lap(p) in the L1, L2 or Linf norm relative to the residual of a
+# zero initial guess (with the boundary values), every `every` iterations:
+# a check costs about one sweep, every=k trades that cost against up to
+# k-1 iterations past convergence. The iteration also stops after
+# maxiter iterations or maxtime seconds, with one last check. Every
+# check is recorded in history, (iteration, relative residual). A zero
+# reference residual means the zero guess is the solution: the monitor
+# reports it converged, residual 0, and later checks measure the
+# absolute residual.
+#
+#   m = Monitor(1e-6, norm='l2', every=10, maxtime=60)
+#   it = iterate(m, residual, update)
+#   m.converged, m.history[-1]
+
+NORMS = ('l1', 'l2', 'linf')
+
+
+def norm(r, kind='l1'):
+    if kind == 'l1':
+        return numpy.sum(numpy.abs(r))
+    if kind == 'l2':
+        r = r.ravel()
+        return numpy.sqrt(numpy.dot(r, r))
+    if kind == 'linf':
+        return numpy.max(numpy.abs(r))
+    raise ValueError('unknown norm %r, use one of %s'
+                     % (kind, ', '.join(NORMS)))
+
+
+class Monitor(object):
+    def __init__(self, tol, norm='l1', every=1, maxiter=None, maxtime=None):
+        if norm not in NORMS:
+            raise ValueError('unknown norm %r, use one of %s'
+                             % (norm, ', '.join(NORMS)))
+        self.tol = tol
+        self.norm = norm
+        self.every = max(1, int(every))
+        self.maxiter = maxiter
+        self.deadline = None if maxtime is None else \
+                        time.perf_counter() + maxtime
+        self.ref = 1.
+        self.history = []
+        self.converged = False
+
+    def reference(self, r):
+        """Set the reference from the residual r of the zero initial
+        guess, returns its norm."""
+        self.ref = norm(r, self.norm)
+        if self.ref == 0:
+            self.history.append((0, 0.))
+            self.converged = True
+        return self.ref
+
+    def check(self, it, r):
+        """Record the relative residual of iteration it, True once it is
+        below tol."""
+        value = norm(r, self.norm)
+        if self.ref:
+            value /= self.ref
+        self.history.append((it, value))
+        self.converged = bool(value <= self.tol)
+        return not value > self.tol # NaN: stop, not converged
+
+    def exhausted(self, it):
+        return (self.maxiter is not None and it >= self.maxiter) or \
+               (self.deadline is not None and
+                time.perf_counter() >= self.deadline)
+
+    @property
+    def residual(self):
+        return self.history[-1][1] if self.history else None
+
+    def report(self, info):
+        if info is not None:
+            info['converged'] = self.converged
+            info['residual'] = self.residual
+            info['history'] = numpy.array(self.history).reshape(-1, 2)
+
+
+def iterate(monitor, residual, update, metrics=None, cells=0):
+    """Call update() until monitor stops the iteration, residual() returns
+    the current residual; returns the number of updates."""
+    it = 0
+    while True:
+        exhausted = monitor.exhausted(it)
+        if exhausted or it % monitor.every == 0:
+            if metrics is not None:
+                t = metrics.clock()
+            done = monitor.check(it, residual())
+            if metrics is not None:
+                metrics.check(t, it, monitor.residual)
+            if done or exhausted:
+                return it
+        if metrics is not None:
+            t0 = metrics.begin(it)
+        update()
+        it += 1
+        if metrics is not None:
+            metrics.end(t0, cells, it)
@@ -0,0 +1,171 @@
+import copy
+import multiprocessing
+from multiprocessing import shared_memory
+
+import numpy
+
+######################################################################
+# DOMAIN-DECOMPOSED 2D STEPPING ON SHARED MEMORY                     #
+######################################################################
+# The interior rows (x, axis 0) are split into one strip per worker
+# process. Both time levels of all fields live in one shared memory block,
+# so the one-cell halo of a strip is just the neighbouring row of the
+# neighbouring strip: every worker updates its rows from a view that
+# includes one row above and below, then waits at a barrier. One barrier
+# per step is enough, the buffer written in step n+1 was last read in
+# step n, before the barrier.
+# Each worker also sets the Dirichlet walls of its own rows (and the
+# x = xmin / x = xmax walls for the first / last strip), so the results
+# are the ones of solver.advance().
+#
+#   with Decomposed(cfd.ConvDiff2D(grid, u, v, nu, dt), workers=8) as par:
+#       par.advance(nt)
+#   u, v = solver.fields    # the state is copied back on close
+
+
+def strips(nx, workers):
+    # [lo, hi) bounds of the interior rows 1 .. nx-2 of each worker
+    bounds = numpy.linspace(1, nx-1, workers+1).astype(int)
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def set_walls(f, bc, first, last):
+    # Dirichlet walls of a strip view f = field[..., lo-1:hi+1, :]
+    f[...,1:-1,0] = bc
+    f[...,1:-1,-1] = bc
+    if first:
+        f[...,0,:] = bc
+    if last:
+        f[...,-1,:] = bc
+
+
+def worker(solver, name, shape, lo, hi, nx, barrier, conn):
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        bufs = numpy.ndarray(shape, solver.dtype, buffer=shm.buf)
+        rows = slice(lo-1, hi+1)
+        cur = [f[...,rows,:] for f in bufs[0]]
+        nxt = [f[...,rows,:] for f in bufs[1]]
+        work = [numpy.empty(solver.batch + (hi-lo, shape[-1]-2), solver.dtype)
+                for i in range(solver.nwork)]
+        first, last = lo == 1, hi == nx-1
+        while True:
+            nt = conn.recv()
+            if nt is None:
+                break
+            for n in range(nt):
+                solver.interior(nxt, cur, work)
+                if solver.bc is not None:
+                    for f in nxt:
+                        set_walls(f, solver.bc, first, last)
+                barrier.wait()
+                cur, nxt = nxt, cur
+            conn.send(nt)
+    except Exception:
+        barrier.abort()
+        raise
+    finally:
+        # the views must be gone before the block can be closed
+        bufs = cur = nxt = None
+        shm.close()
+
+
+class Decomposed(object):
+    """Runs a 2D solver (Solver2D) on workers processes, each stepping one
+    strip of rows. advance(), fields, t and n as for the solver; close()
+    (or leaving the with block) stops the workers and copies the state
+    back into the solver."""
+
+    def __init__(self, solver, workers=None):
+        if solver.scheme != 'euler':
+            raise ValueError('decomposed stepping is forward Euler only')
+        if len(solver.grid.shape) != 2:
+            raise ValueError('decomposed stepping is 2D only, use '
+                             'solver.threads')
+        if solver.halo is not None:
+            raise ValueError('decomposed stepping needs Dirichlet walls '
+                             '(or none), not a %s halo' % solver.halo)
+        nx = solver.grid.nx
+        workers = min(workers or multiprocessing.cpu_count(), nx-2)
+        self.solver = solver
+        self.t, self.n = solver.t, solver.n
+        shape = (2, len(solver.names)) + solver.cur[0].shape
+        self.shm = shared_memory.SharedMemory(
+            create=True, size=int(numpy.prod(shape))*solver.dtype.itemsize)
+        self.bufs = numpy.ndarray(shape, solver.dtype, buffer=self.shm.buf)
+        self.bufs[0] = solver.cur
+        self.bufs[1] = solver.nxt
+        self.parity = 0
+        # the workers get the solver without its buffers
+        light = copy.copy(solver)
+        light.cur = light.nxt = light.work = light.metrics = light.pool = None
+        barrier = multiprocessing.Barrier(workers)
+        self.procs, self.conns = [], []
+        for lo, hi in strips(nx, workers):
+            conn, child = multiprocessing.Pipe()
+            p = multiprocessing.Process(
+                target=worker, daemon=True,
+                args=(light, self.shm.name, shape, lo, hi, nx, barrier, child))
+            p.start()
+            self.procs.append(p)
+            self.conns.append(conn)
+
+    @property
+    def names(self):
+        return self.solver.names
+
+    @property
+    def fields(self):
+        return tuple(self.bufs[self.parity])
+
+    def __getattr__(self, name):
+        if name in self.solver.names:
+            return self.fields[self.solver.names.index(name)]
+        raise AttributeError(name)
+
+    def advance(self, nt):
+        m = self.solver.metrics
+        if m is not None: # the workers' nt steps: one pre/post_step event
+            t0 = m.begin(self)
+        for conn in self.conns:
+            conn.send(nt)
+        for p, conn in zip(self.procs, self.conns):
+            while not conn.poll(0.1):
+                if not p.is_alive():
+                    self.close()
+                    raise RuntimeError('decomposed worker %d died' % p.pid)
+            conn.recv()
+        for n in range(0,nt):
+            self.t += self.solver.dt
+            self.n += 1
+        self.parity = (self.parity + nt) % 2
+        if m is not None:
+            m.end(t0, nt*self.bufs[0,0].size, self, steps=nt)
+        return self
+
+    def close(self):
+        if self.shm is None:
+            return
+        for p, conn in zip(self.procs, self.conns):
+            if p.is_alive():
+                conn.send(None)
+        for p in self.procs:
+            p.join(5)
+            if p.is_alive():
+                p.terminate()
+        s = self.solver
+        for f, cur, nxt in zip(s.names, self.bufs[self.parity],
+                               self.bufs[1-self.parity]):
+            s.cur[s.names.index(f)][...] = cur
+            s.nxt[s.names.index(f)][...] = nxt
+        s.t, s.n = self.t, self.n
+        self.bufs = None
+        self.shm.close()
+        self.shm.unlink()
+        self.shm = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,336 @@
+import time
+
+import numpy
+
+from . import convergence, multigrid, sparse, spectral
+from .multigrid import NEUMANN
+
+######################################################################
+# ELLIPTIC SOLVERS, p stored as (nx, ny)                             #
+######################################################################
+# method='jacobi' is the original point Jacobi iteration. The iterative
+# methods stop once the residual has dropped below the target times the
+# residual of a zero initial guess (see convergence.py; laplace2d takes
+# the norm, L1 by default, the check interval and the iteration and time
+# budgets):
+#   'multigrid'  multigrid V-cycles, see multigrid.py. Without an initial
+#                guess (interior all zero) it starts with a full multigrid
+#                pass.
+#   'sor'        red-black successive over-relaxation with the optimal
+#                relaxation factor of the grid, see sor_omega()
+#   'dst'        direct solve with discrete sine transforms when all sides
+#                are Dirichlet (see spectral.py), 'multigrid' otherwise
+#   'splu'       direct solve with the cached sparse LU factorization of
+#                the grid's operator (see sparse.py)
+#   'pcg'        conjugate gradients preconditioned with a multigrid
+#                V-cycle on the cached operator, stops on scipy's relative
+#                L2 residual (no time budget, no history)
+# If info is a dict it receives the method actually used, the number of
+# iterations (sweeps, V-cycles, 1 for the direct solve) and the wall time,
+# for the monitored methods also whether they converged, the last
+# relative residual and the history of the checks, (iteration, residual)
+# rows.
+# With metrics (a cfd.Metrics) every iteration is timed and the hooks are
+# called; a direct solve counts as one iteration.
+#
+# Precision: the solvers work in the floating point type of p. With dtype
+# (e.g. numpy.float32) other than that of p, 'jacobi', 'sor' and
+# 'multigrid' run mixed: sweeps / V-cycles in dtype compute a correction,
+# the residual and the solution stay in the precision of p (iterative
+# refinement, see refine()). The solution converges as far as in float64
+# while the sweeps move half the bytes.
+
+METHODS = ('jacobi', 'multigrid', 'sor', 'dst', 'splu', 'pcg')
+# iteration limit of a method without maxiter
+MAXITER = {'multigrid': 100, 'dst': 100, 'sor': 100000, 'pcg': None}
+# iterations between residual checks without every: a check costs about
+# as much as a Jacobi sweep, little against a V-cycle or SOR sweep
+EVERY = {'jacobi': 10}
+
+
+def laplace2d(p, y, dx, dy, l1norm_target, method='jacobi', info=None,
+              metrics=None, norm='l1', every=None, maxiter=None, maxtime=None,
+              dtype=None):
+    """Laplace equation, p = 0 @ x = 0, p = y @ x = 2, dp/dy = 0 @ y = 0, 1.
+
+    Iterates until the relative residual (norm 'l1', 'l2' or 'linf',
+    checked every `every` iterations, default 10 for jacobi and 1
+    otherwise) drops below l1norm_target, for at most maxiter iterations
+    and maxtime seconds.
+    pcg: scipy's L2 criterion, maxiter only
+    dst: the Neumann sides are not supported, solved with multigrid
+    dtype: precision of the sweeps, mixed precision if not that of p (for
+    jacobi and sor a float64 correction every `every` sweeps)
+    """
+    t = time.perf_counter()
+    if maxiter is None:
+        maxiter = MAXITER.get(method)
+    if every is None:
+        every = EVERY.get(method, 1)
+    monitor = convergence.Monitor(l1norm_target, norm, every, maxiter,
+                                  maxtime)
+    bc = (0, y, NEUMANN, NEUMANN)
+    if mixed(p, dtype):
+        method, it = refine(method, p, numpy.zeros_like(p), dx, dy, bc,
+                            monitor, dtype, metrics)
+    elif method == 'jacobi':
+        it = laplace_jacobi(p, y, dx, dy, monitor, metrics)
+    else:
+        method, it = solve(method, p, numpy.zeros_like(p), dx, dy, bc,
+                           monitor, metrics)
+    report(info, method, it, t, monitor)
+    return p
+
+
+def poisson2d(p, pp, b, dx, dy, steps, method='jacobi', tol=1e-8, info=None,
+              metrics=None, dtype=None):
+    """Poisson equation with source b, p = 0 on all walls.
+
+    jacobi: steps sweeps
+    multigrid, sor, pcg: at most steps iterations, stops once the relative
+    residual is below tol
+    dst, splu: direct solve, steps and tol are not used
+    dtype: precision of the sweeps, mixed precision if not that of p
+    (jacobi: steps sweeps of the error equation, a float64 correction
+    every 10)
+    """
+    t = time.perf_counter()
+    if mixed(p, dtype):
+        monitor = convergence.Monitor(0. if method == 'jacobi' else tol,
+                                      every=EVERY.get(method, 1),
+                                      maxiter=steps)
+        method, it = refine(method, p, b, dx, dy, (0, 0, 0, 0), monitor,
+                            dtype, metrics)
+        report(info, method, it, t, monitor)
+        return p
+    if method == 'jacobi':
+        p = poisson_jacobi(p, pp, b, dx, dy, steps, metrics)
+        it = steps
+    else:
+        monitor = convergence.Monitor(tol, maxiter=steps)
+        method, it = solve(method, p, b, dx, dy, (0, 0, 0, 0), monitor,
+                           metrics)
+        report(info, method, it, t, monitor)
+        return p
+    report(info, method, it, t)
+    return p
+
+
+def report(info, method, it, t, monitor=None):
+    if info is not None:
+        info['method'] = method
+        info['iterations'] = it
+        info['time'] = time.perf_counter() - t
+        if monitor is not None and monitor.history:
+            monitor.report(info)
+
+
+def solve(method, p, b, dx, dy, bc, monitor, metrics=None):
+    # returns (method used, iterations)
+    if method == 'dst':
+        if spectral.supported(bc):
+            if metrics is not None:
+                t0 = metrics.begin(0)
+            spectral.solve(p, b, dx, dy, bc)
+            if metrics is not None:
+                metrics.end(t0, p[1:-1,1:-1].size, 1)
+            return method, 1
+        method = 'multigrid'
+    if method == 'multigrid':
+        return method, multigrid.solve(p, b, dx, dy, bc,
+                                       use_fmg=not p[1:-1,1:-1].any(),
+                                       monitor=monitor, metrics=metrics)[1]
+    elif method == 'sor':
+        return method, sor(p, b, dx, dy, bc, monitor=monitor,
+                           metrics=metrics)[1]
+    elif method in ('splu', 'pcg'):
+        return method, sparse.solve(p, b, dx, dy, bc, method,
+                                    tol=monitor.tol, maxiter=monitor.maxiter,
+                                    metrics=metrics)[1]
+    raise ValueError('unknown method %r, use one of %s'
+                     % (method, ', '.join(METHODS)))
+
+
+# Jacobi
+##############################
+def laplace_jacobi(p, y, dx, dy, monitor, metrics=None):
+    # the sweeps alternate between p and a second buffer (no copy per
+    # sweep), the result is copied back into p at the end
+    b = numpy.zeros_like(p)
+    r = numpy.zeros_like(p)
+    p0 = numpy.zeros_like(p)
+    multigrid.apply_bc(p0, (0, y, NEUMANN, NEUMANN))
+    if monitor.reference(multigrid.residual(p0, b, dx, dy, r)) == 0:
+        p[:] = p0
+        return 0
+    cur, new = p, p.copy()
+    work = numpy.empty_like(p[1:-1,1:-1])
+
+    def sweep():
+        nonlocal cur, new, work
+        pn = new[1:-1,1:-1]
+        numpy.add(cur[2:,1:-1], cur[0:-2,1:-1], out=pn)
+        pn *= dy**2
+        numpy.add(cur[1:-1,2:], cur[1:-1,0:-2], out=work)
+        work *= dx**2
+        pn += work
+        pn /= 2*(dx**2+dy**2)
+
+        if metrics is not None:
+            t = metrics.clock()
+        new[0,:] = 0  # p = 0 @ x = 0
+        new[-1,:] = y # p = y @ x = 2
+        new[:,0] = new[:,1] # dp/dy = 0 @ y = 0
+        new[:,-1] = new[:,-2]   # dp/dy = 0 @ y = 1
+        if metrics is not None:
+            metrics.phase('bc', t, new)
+        cur, new = new, cur
+
+    it = convergence.iterate(
+        monitor, lambda: multigrid.residual(cur, b, dx, dy, r), sweep,
+        metrics, r[1:-1,1:-1].size)
+    if cur is not p:
+        p[...] = cur
+    return it
+
+
+def poisson_jacobi(p, pp, b, dx, dy, steps, metrics=None):
+    for i in range(steps):
+        if metrics is not None:
+            t0 = metrics.begin(i)
+        p[1:-1,1:-1] = ((pp[2:,1:-1]+pp[0:-2,1:-1])*dy**2+\
+                        (pp[1:-1,2:]+pp[1:-1,0:-2])*dx**2-\
+                        b[1:-1,1:-1]*dx**2*dy**2)/\
+                        (2*(dx**2+dy**2))
+
+        # BCs
+        if metrics is not None:
+            t = metrics.clock()
+        p[0,:] = 0   # @ x=0
+        p[-1,:] = 0  # @ x=2
+        p[:,0] = 0   # @ y=0
+        p[:,-1] = 0  # @ y=1
+        if metrics is not None:
+            metrics.phase('bc', t, p)
+
+        # Update pp
+        pp = p
+        if metrics is not None:
+            metrics.end(t0, p[1:-1,1:-1].size, i+1)
+
+    return p
+
+
+# Mixed precision
+##############################
+def mixed(p, dtype):
+    return dtype is not None and numpy.dtype(dtype) != p.dtype
+
+
+def jacobi_sweep(new, cur, b, dx, dy, bc, work):
+    # one Jacobi sweep for d2p/dx2 + d2p/dy2 = b from cur into new
+    pn = new[1:-1,1:-1]
+    numpy.add(cur[2:,1:-1], cur[0:-2,1:-1], out=pn)
+    pn *= dy**2
+    numpy.add(cur[1:-1,2:], cur[1:-1,0:-2], out=work)
+    work *= dx**2
+    pn += work
+    numpy.multiply(b[1:-1,1:-1], dx**2*dy**2, out=work)
+    pn -= work
+    pn /= 2*(dx**2+dy**2)
+    multigrid.apply_bc(new, bc)
+
+
+def refine(method, p, b, dx, dy, bc, monitor, dtype, metrics=None):
+    """Iterative refinement: the residual r = b - Lap(p) and p are kept in
+    the precision of p, the correction e of Lap(e) = r comes from
+    monitor.every Jacobi or SOR sweeps, or one V-cycle, in dtype from
+    e = 0. The residual is checked after every correction. Returns (method
+    used, sweeps / V-cycles)."""
+    if method == 'dst':
+        method = 'multigrid'
+    if method not in ('jacobi', 'sor', 'multigrid'):
+        raise ValueError('mixed precision needs jacobi, sor or multigrid, '
+                         'not %r' % method)
+    k = 1 if method == 'multigrid' else monitor.every
+    monitor.every = 1
+    if monitor.maxiter is not None:
+        monitor.maxiter = -(-monitor.maxiter//k)
+    nx, ny = p.shape
+    r = numpy.zeros_like(p)
+    p0 = numpy.zeros_like(p)
+    multigrid.apply_bc(p0, bc)
+    if monitor.reference(multigrid.residual(p0, b, dx, dy, r)) == 0:
+        p[:] = p0
+        return method, 0
+    multigrid.apply_bc(p, bc)
+    hbc = multigrid.homogeneous(bc)
+    e = numpy.zeros((nx, ny), dtype)
+    f = numpy.zeros((nx, ny), dtype)
+    if method == 'multigrid':
+        levels = multigrid.hierarchy(nx, ny, dx, dy, dtype=dtype)
+    elif method == 'sor':
+        omega = sor_omega(nx, ny, dx, dy, bc)
+    else:
+        en = numpy.zeros_like(e)
+        work = numpy.empty((nx-2, ny-2), dtype)
+
+    def correct():
+        f[...] = r # the residual of p, computed by the check before
+        e[...] = 0
+        if method == 'multigrid':
+            multigrid.vcycle(levels, 0, e, f, hbc)
+            ec = e
+        elif method == 'sor':
+            for i in range(k):
+                multigrid.rb_sweep(e, f, dx, dy, hbc, omega)
+            ec = e
+        else:
+            ec, en_ = e, en
+            for i in range(k):
+                jacobi_sweep(en_, ec, f, dx, dy, hbc, work)
+                ec, en_ = en_, ec
+        numpy.add(p, ec, out=p)
+        multigrid.apply_bc(p, bc)
+
+    it = convergence.iterate(
+        monitor, lambda: multigrid.residual(p, b, dx, dy, r), correct,
+        metrics, k*r[1:-1,1:-1].size)
+    return method, it*k
+
+
+# Red-black SOR
+##############################
+def sor_omega(nx, ny, dx, dy, bc=(0, 0, 0, 0)):
+    """Optimal SOR factor 2/(1 + sqrt(1 - rho**2)), rho being the spectral
+    radius of Jacobi for the 5-point Laplacian on the grid. Its slowest
+    mode along an axis is sin(pi*x/L) between two Dirichlet sides,
+    sin(pi*x/2L) for Dirichlet-Neumann and constant for Neumann-Neumann."""
+    def cos(n, sides):
+        nneumann = sum(isinstance(s, str) for s in sides)
+        return numpy.cos(numpy.pi/(n-1)*(2-nneumann)/2)
+    rho = (dy**2*cos(nx, bc[:2]) + dx**2*cos(ny, bc[2:]))/(dx**2+dy**2)
+    return 2/(1+numpy.sqrt(1-rho**2))
+
+
+def sor(p, b, dx, dy, bc, tol=1e-8, maxiter=100000, omega=None,
+        monitor=None, metrics=None):
+    """Red-black SOR sweeps until the L1 residual has dropped below tol
+    times the residual of a zero initial guess (or the criteria of
+    monitor, a convergence.Monitor). p is updated in place, returns (p,
+    number of sweeps)."""
+    if omega is None:
+        omega = sor_omega(p.shape[0], p.shape[1], dx, dy, bc)
+    if monitor is None:
+        monitor = convergence.Monitor(tol, maxiter=maxiter)
+    r = numpy.zeros_like(p)
+    p0 = numpy.zeros_like(p)
+    multigrid.apply_bc(p0, bc)
+    if monitor.reference(multigrid.residual(p0, b, dx, dy, r)) == 0:
+        p[:] = p0
+        return p, 0
+    multigrid.apply_bc(p, bc)
+    return p, convergence.iterate(
+        monitor, lambda: multigrid.residual(p, b, dx, dy, r),
+        lambda: multigrid.rb_sweep(p, b, dx, dy, bc, omega), metrics,
+        r[1:-1,1:-1].size)
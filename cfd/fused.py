@@ -0,0 +1,84 @@
+import functools
+
+import numpy
+
+######################################################################
+# FUSED COMPILED KERNELS (numba)                                     #
+######################################################################
+# The numpy kernels sweep memory once per ufunc, about 20 passes per field
+# and step for the convection-diffusion update. The loops below compute
+# the u and v updates of a point in one pass over the fields. Each point
+# goes through the same floating point operations in the same order as
+# kernels.conv_diff2d (no fastmath, no contraction to fma), so the results
+# are bit-for-bit those of the numpy path.
+#
+# numba takes most of a second to import: it is loaded, and the loops
+# compiled, the first time a ConvDiff2D asks for them, not on import cfd.
+# available() is False without numba; ConvDiff2D then uses kernels.py.
+
+
+@functools.lru_cache(maxsize=None)
+def available():
+    try:
+        import numba
+    except ImportError: # optional, the solvers fall back to kernels.py
+        return False
+    return True
+
+
+def _conv_diff2d_uv(un, vn, uo, vo, nu, dt, dx, dy, rdx2, rdy2, one):
+    # one: 1 in the precision of the fields, int constants would widen
+    # float32 arithmetic to float64; rdx2, rdy2: 1/dx**2, 1/dy**2 rounded
+    # once to that precision, as the numpy path does
+    nx, ny = un.shape
+    two = one + one
+    for i in range(1, nx-1):
+        for j in range(1, ny-1):
+            # u: see kernels.conv_diff2d
+            a = -uo[i,j]/dx*(uo[i,j] - uo[i-1,j])
+            a = a - vo[i,j]/dy*(uo[i,j] - uo[i,j-1])
+            w1 = rdx2*((uo[i+1,j] - two*uo[i,j]) + uo[i-1,j])
+            w2 = rdy2*((uo[i,j+1] - two*uo[i,j]) + uo[i,j-1])
+            un[i,j] = uo[i,j] + dt*(a + nu*(w1 + w2))
+            # v, with the crosswise i-1/j-1 diffusion neighbours of 08
+            a = -uo[i,j]/dx*(vo[i,j] - vo[i-1,j])
+            a = a - vo[i,j]/dy*(vo[i,j] - vo[i,j-1])
+            w1 = rdx2*((vo[i+1,j] - two*vo[i,j]) + vo[i,j-1])
+            w2 = rdy2*((vo[i,j+1] - two*vo[i,j]) + vo[i-1,j])
+            vn[i,j] = vo[i,j] + dt*(a + nu*(w1 + w2))
+
+
+@functools.lru_cache(maxsize=None)
+def kernel():
+    # the compiled _conv_diff2d_uv (numba's cache=True keeps the machine
+    # code on disk across runs)
+    import numba
+    return numba.njit(cache=True, nogil=True)(_conv_diff2d_uv)
+
+
+def supports(dtype, *params):
+    # scalar parameters, or ensemble arrays in the precision of the fields
+    # (the numpy path computes those in it too)
+    return available() and all(numpy.ndim(p) == 0 or
+                               numpy.result_type(p) == dtype for p in params)
+
+
+def member(p, batch):
+    # a parameter as one value per ensemble member, shape batch (a view)
+    p = numpy.asarray(p)
+    return numpy.broadcast_to(p.reshape(p.shape[:max(p.ndim-2, 0)]), batch)
+
+
+def conv_diff2d_uv(un, vn, uo, vo, nu, dt, dx, dy):
+    """Interior update of u and v for the 2D convection-diffusion (08) in
+    one pass. Leading batch axes are looped over (a reshape could copy
+    the strided views of decomp.py), nu and dt may hold one value per
+    member. The parameters are passed in the precision of the fields,
+    float64 ones would widen float32 loops."""
+    real = un.dtype.type
+    batch = un.shape[:-2]
+    nu, dt = member(nu, batch), member(dt, batch)
+    args = real(dx), real(dy), real(1/dx**2), real(1/dy**2), real(1)
+    f = kernel()
+    for k in numpy.ndindex(batch):
+        f(un[k], vn[k], uo[k], vo[k], real(nu[k]), real(dt[k]), *args)
@@ -0,0 +1,92 @@
+import numpy
+
+
+class Grid1D(object):
+    """Uniform 1D mesh on [xmin, xmax] with nx points."""
+
+    def __init__(self, nx, xmin=0., xmax=2.):
+        self.nx = nx
+        self.xmin = xmin
+        self.xmax = xmax
+        self.dx = (xmax-xmin)/(nx-1)
+        self.x = numpy.linspace(xmin, xmax, nx)
+
+    @property
+    def shape(self):
+        return (self.nx,)
+
+    def zeros(self, dtype=float):
+        return numpy.zeros(self.shape, dtype)
+
+
+class Grid2D(object):
+    """Uniform 2D mesh, fields are stored as (nx, ny): x along axis 0."""
+
+    def __init__(self, nx, ny, xmin=0., xmax=2., ymin=0., ymax=2.):
+        self.nx = nx
+        self.ny = ny
+        self.xmin = xmin
+        self.xmax = xmax
+        self.ymin = ymin
+        self.ymax = ymax
+        self.dx = (xmax-xmin)/(nx-1)
+        self.dy = (ymax-ymin)/(ny-1)
+        self.x = numpy.linspace(xmin, xmax, nx)
+        self.y = numpy.linspace(ymin, ymax, ny)
+
+    @property
+    def shape(self):
+        return (self.nx, self.ny)
+
+    def zeros(self, dtype=float):
+        return numpy.zeros(self.shape, dtype)
+
+    def meshgrid(self):
+        return numpy.meshgrid(self.x, self.y, indexing='ij')
+
+
+class Grid3D(object):
+    """Uniform 3D mesh, fields are stored as (nx, ny, nz): x along axis 0,
+    z contiguous."""
+
+    def __init__(self, nx, ny, nz, xmin=0., xmax=2., ymin=0., ymax=2.,
+                 zmin=0., zmax=2.):
+        self.nx = nx
+        self.ny = ny
+        self.nz = nz
+        self.xmin = xmin
+        self.xmax = xmax
+        self.ymin = ymin
+        self.ymax = ymax
+        self.zmin = zmin
+        self.zmax = zmax
+        self.dx = (xmax-xmin)/(nx-1)
+        self.dy = (ymax-ymin)/(ny-1)
+        self.dz = (zmax-zmin)/(nz-1)
+        self.x = numpy.linspace(xmin, xmax, nx)
+        self.y = numpy.linspace(ymin, ymax, ny)
+        self.z = numpy.linspace(zmin, zmax, nz)
+
+    @property
+    def shape(self):
+        return (self.nx, self.ny, self.nz)
+
+    def zeros(self, dtype=float):
+        return numpy.zeros(self.shape, dtype)
+
+    def meshgrid(self):
+        return numpy.meshgrid(self.x, self.y, self.z, indexing='ij')
+
+
+def describe(grid):
+    # (class name, constructor arguments): enough to rebuild the grid
+    args = {Grid1D: ('nx', 'xmin', 'xmax'),
+            Grid2D: ('nx', 'ny', 'xmin', 'xmax', 'ymin', 'ymax'),
+            Grid3D: ('nx', 'ny', 'nz', 'xmin', 'xmax', 'ymin', 'ymax',
+                     'zmin', 'zmax')}[type(grid)]
+    return type(grid).__name__, {k: getattr(grid, k) for k in args}
+
+
+def rebuild(name, args):
+    return {'Grid1D': Grid1D, 'Grid2D': Grid2D,
+            'Grid3D': Grid3D}[name](**args)
@@ -0,0 +1,54 @@
+import numpy
+
+######################################################################
+# GHOST-CELL HALO OF THE 2D FIELDS                                   #
+######################################################################
+# A padded field holds the nx x ny grid points in p[..., 1:-1, 1:-1] and
+# one layer of ghost cells around them. The stencil kernels update
+# p[..., 1:-1, 1:-1], i.e. every grid point, including the walls, reading
+# the ghost cells as the neighbours outside the domain. After each update
+# fill() sets the ghost cells from the new values in one pass over the
+# halo: the rows first, then the columns over the full padded height,
+# which also fills the corners.
+#
+# Boundaries:
+#   periodic   the neighbour of the first point is the last one, as for
+#              the 1D solvers (the domain has period nx*dx, ny*dy)
+#   neumann    zero normal gradient, the ghost cell is the wall point
+#
+# Dirichlet walls need no halo, the walls are set in the unpadded fields
+# (kernels.dirichlet).
+
+KINDS = ('periodic', 'neumann')
+
+
+def pad(f, kind):
+    """f of shape (..., nx, ny) copied into a new padded array
+    (..., nx+2, ny+2) with its halo filled."""
+    f = numpy.asarray(f)
+    p = numpy.empty(f.shape[:-2] + (f.shape[-2]+2, f.shape[-1]+2), f.dtype)
+    p[...,1:-1,1:-1] = f
+    fill(p, kind)
+    return p
+
+
+def fill(p, kind):
+    """Set the ghost cells of the padded field p in place."""
+    if kind == 'periodic':
+        p[...,0,1:-1] = p[...,-2,1:-1]
+        p[...,-1,1:-1] = p[...,1,1:-1]
+        p[...,:,0] = p[...,:,-2]
+        p[...,:,-1] = p[...,:,1]
+    elif kind == 'neumann':
+        p[...,0,1:-1] = p[...,1,1:-1]
+        p[...,-1,1:-1] = p[...,-2,1:-1]
+        p[...,:,0] = p[...,:,1]
+        p[...,:,-1] = p[...,:,-2]
+    else:
+        raise ValueError('unknown halo %r, use one of %s'
+                         % (kind, ', '.join(KINDS)))
+
+
+def interior(p):
+    # the grid points of a padded field, a view
+    return p[...,1:-1,1:-1]
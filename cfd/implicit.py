@@ -0,0 +1,93 @@
+import functools
+
+import numpy
+
+######################################################################
+# TRIDIAGONAL SOLVES FOR IMPLICIT DIFFUSION                          #
+######################################################################
+# Constant-coefficient tridiagonal systems
+#     a*x[i-1] + b*x[i] + c*x[i+1] = d[i]
+# solved along one axis of d for all lines at once, O(N) per line. With
+# periodic=True the matrix is cyclic (a in the top-right, c in the
+# bottom-left corner), solved with the Sherman-Morrison formula on top of
+# a tridiagonal one.
+#
+# The factorization depends on (n, a, b, c, periodic) only: factor() keeps
+# them in an LRU cache, a run with fixed dt factors its matrix once. The
+# factorization is LAPACK's gttrf (scipy) or, without scipy, the forward
+# elimination of the Thomas algorithm (no pivoting, fine for the
+# diagonally dominant diffusion matrices). scipy is imported by the
+# first factorization, not with the package.
+
+
+@functools.lru_cache(maxsize=None)
+def lapack():
+    # scipy.linalg.lapack, None without scipy
+    try:
+        from scipy.linalg import lapack
+    except ImportError: # numpy fallback below
+        return None
+    return lapack
+
+
+class Tridiagonal(object):
+    def __init__(self, n, a, b, c, periodic=False):
+        self.n = n
+        dl, d, du = numpy.full(n-1, a, float), numpy.full(n, b, float), \
+                    numpy.full(n-1, c, float)
+        if periodic:
+            # A = T + p q^T with p = (g, 0, .., 0, c), q = (1, 0, .., 0, a/g)
+            g = -b
+            d[0] -= g
+            d[-1] -= c*a/g
+        if lapack() is not None:
+            dl, d, du, du2, ipiv, info = lapack().dgttrf(dl, d, du)
+            if info != 0:
+                raise numpy.linalg.LinAlgError('singular tridiagonal matrix')
+            self.lu = dl, d, du, du2, ipiv
+        else:
+            # Thomas: modified super-diagonal and inverse pivots
+            cp, m = numpy.empty(n-1), numpy.empty(n)
+            m[0] = 1/d[0]
+            for i in range(1, n):
+                cp[i-1] = du[i-1]*m[i-1]
+                m[i] = 1/(d[i] - dl[i-1]*cp[i-1])
+            self.dl, self.cp, self.m = dl, cp, m
+        self.periodic = periodic
+        if periodic:
+            p = numpy.zeros((n, 1))
+            p[0], p[-1] = g, c
+            self.z = self._solve(p)[:,0]
+            self.qn = a/g
+            self.denom = 1 + self.z[0] + self.qn*self.z[-1]
+
+    def _solve(self, d):
+        # T x = d for the columns of d, shape (n, lines)
+        if lapack() is not None:
+            x, info = lapack().dgttrs(*self.lu, d)
+            return x
+        x = d.copy()
+        x[0] *= self.m[0]
+        for i in range(1, self.n):
+            x[i] -= self.dl[i-1]*x[i-1]
+            x[i] *= self.m[i]
+        for i in range(self.n-2, -1, -1):
+            x[i] -= self.cp[i]*x[i+1]
+        return x
+
+    def solve(self, d, axis=-1, out=None):
+        """Solve along axis of d for every line, returns x (or out)."""
+        dm = numpy.moveaxis(d, axis, 0)
+        x = self._solve(dm.reshape(self.n, -1))
+        if self.periodic:
+            x -= self.z[:,None]*((x[0] + self.qn*x[-1])/self.denom)
+        x = numpy.moveaxis(x.reshape(dm.shape), 0, axis)
+        if out is None:
+            return x
+        out[...] = x
+        return out
+
+
+@functools.lru_cache(maxsize=16)
+def factor(n, a, b, c, periodic=False):
+    return Tridiagonal(n, a, b, c, periodic)
@@ -0,0 +1,226 @@
+import numpy
+
+######################################################################
+# EXPLICIT STENCIL KERNELS                                           #
+######################################################################
+# Advance in time: Euler forward (Forward Differencing)
+# discretize in space: Backward Differencing (convection), Central
+# Differencing (diffusion)
+#
+# Every kernel reads the previous time-step from the *o arrays and writes
+# the new one straight into the *n arrays (ufuncs with out=), so no
+# temporary is allocated per step. The order of operations is the one of
+# the original scripts, results are bit-for-bit identical.
+# Work arrays w, w1, w2 are of the size of the updated points: nx for 1D,
+# (nx-2, ny-2) for 2D, (nx-2, ny-2, nz-2) for 3D.
+#
+# Fields may carry leading batch axes (an ensemble of runs), the stencils
+# only index the last one (1D), two (2D) or three (3D) axes. Parameters (c, nu, dt)
+# are scalars or arrays broadcasting against the fields, e.g. nu of shape
+# (nbatch, 1) for 1D or (nbatch, 1, 1) for 2D.
+
+
+# 1D: periodic BC, all are internal points
+##############################
+def lin_conv(un, uo, c, dt, dx):
+    numpy.subtract(uo[...,1:], uo[...,0:-1], out=un[...,1:])
+    numpy.multiply(c*dt/dx, un[...,1:], out=un[...,1:])
+    numpy.subtract(uo[...,1:], un[...,1:], out=un[...,1:])
+    un[...,:1] = uo[...,:1] - c*dt/dx*(uo[...,:1] - uo[...,-1:])
+
+
+def nonl_conv(un, uo, dt, dx, w):
+    numpy.multiply(uo[...,1:], dt, out=un[...,1:])
+    numpy.divide(un[...,1:], dx, out=un[...,1:])
+    numpy.subtract(uo[...,1:], uo[...,0:-1], out=w[...,1:])
+    numpy.multiply(un[...,1:], w[...,1:], out=un[...,1:])
+    numpy.subtract(uo[...,1:], un[...,1:], out=un[...,1:])
+    un[...,:1] = uo[...,:1] - uo[...,:1]*dt/dx*(uo[...,:1] - uo[...,-1:])
+
+
+def diffusion(un, uo, nu, dt, dx):
+    numpy.multiply(2, uo[...,1:-1], out=un[...,1:-1])
+    numpy.subtract(uo[...,2:], un[...,1:-1], out=un[...,1:-1])
+    numpy.add(un[...,1:-1], uo[...,0:-2], out=un[...,1:-1])
+    numpy.multiply(nu*dt/dx**2, un[...,1:-1], out=un[...,1:-1])
+    numpy.add(uo[...,1:-1], un[...,1:-1], out=un[...,1:-1])
+    un[...,:1] = uo[...,:1] + nu*dt/dx**2*(uo[...,1:2] - 2*uo[...,:1] + uo[...,-1:])
+    un[...,-1:] = uo[...,-1:] + nu*dt/dx**2*(uo[...,:1] - 2*uo[...,-1:] + uo[...,-2:-1])
+
+
+def burgers(un, uo, nu, dt, dx, w):
+    # convection: uo - uo*dt/dx*(uo - uo[i-1])
+    numpy.multiply(uo[...,1:-1], dt, out=un[...,1:-1])
+    numpy.divide(un[...,1:-1], dx, out=un[...,1:-1])
+    numpy.subtract(uo[...,1:-1], uo[...,0:-2], out=w[...,1:-1])
+    numpy.multiply(un[...,1:-1], w[...,1:-1], out=un[...,1:-1])
+    numpy.subtract(uo[...,1:-1], un[...,1:-1], out=un[...,1:-1])
+    # diffusion: nu*dt/dx**2*(uo[i+1] - 2*uo + uo[i-1])
+    numpy.multiply(2, uo[...,1:-1], out=w[...,1:-1])
+    numpy.subtract(uo[...,2:], w[...,1:-1], out=w[...,1:-1])
+    numpy.add(w[...,1:-1], uo[...,0:-2], out=w[...,1:-1])
+    numpy.multiply(nu*dt/dx**2, w[...,1:-1], out=w[...,1:-1])
+    numpy.add(un[...,1:-1], w[...,1:-1], out=un[...,1:-1])
+
+    un[...,:1] = uo[...,:1] - uo[...,:1]*dt/dx*(uo[...,:1] - uo[...,-1:]) + \
+            nu*dt/dx**2*(uo[...,1:2]-2*uo[...,:1]+uo[...,-1:])
+    un[...,-1:] = uo[...,-1:] - uo[...,-1:]*dt/dx*(uo[...,-1:] - uo[...,-2:-1]) + \
+            nu*dt/dx**2*(uo[...,:1]-2*uo[...,-1:]+uo[...,-2:-1])
+
+
+# 2D: interior points only, x along axis 0
+##############################
+def lin_conv2d(fn, fo, c, dt, dx, dy, w):
+    # fn = fo - c*dt/dx*(fo - fo[i-1,j]) - c*dt/dy*(fo - fo[i,j-1])
+    numpy.subtract(fo[...,1:-1,1:-1], fo[...,0:-2,1:-1], out=fn[...,1:-1,1:-1])
+    numpy.multiply(c*dt/dx, fn[...,1:-1,1:-1], out=fn[...,1:-1,1:-1])
+    numpy.subtract(fo[...,1:-1,1:-1], fn[...,1:-1,1:-1], out=fn[...,1:-1,1:-1])
+    numpy.subtract(fo[...,1:-1,1:-1], fo[...,1:-1,0:-2], out=w)
+    numpy.multiply(c*dt/dy, w, out=w)
+    numpy.subtract(fn[...,1:-1,1:-1], w, out=fn[...,1:-1,1:-1])
+
+
+def nonl_conv2d(fn, fo, uo, vo, dt, dx, dy, w1, w2):
+    # fn = fo - uo*dt/dx*(fo - fo[i-1,j]) - vo*dt/dy*(fo - fo[i,j-1])
+    numpy.multiply(uo[...,1:-1,1:-1], dt, out=fn[...,1:-1,1:-1])
+    numpy.divide(fn[...,1:-1,1:-1], dx, out=fn[...,1:-1,1:-1])
+    numpy.subtract(fo[...,1:-1,1:-1], fo[...,0:-2,1:-1], out=w1)
+    numpy.multiply(fn[...,1:-1,1:-1], w1, out=fn[...,1:-1,1:-1])
+    numpy.subtract(fo[...,1:-1,1:-1], fn[...,1:-1,1:-1], out=fn[...,1:-1,1:-1])
+    numpy.multiply(vo[...,1:-1,1:-1], dt, out=w1)
+    numpy.divide(w1, dy, out=w1)
+    numpy.subtract(fo[...,1:-1,1:-1], fo[...,1:-1,0:-2], out=w2)
+    numpy.multiply(w1, w2, out=w1)
+    numpy.subtract(fn[...,1:-1,1:-1], w1, out=fn[...,1:-1,1:-1])
+
+
+def diffusion2d(fn, fo, nu, dt, dx, dy, w):
+    # fn = fo + nu*dt*(1/dx**2*(d2f/dx2) + 1/dy**2*(d2f/dy2))
+    numpy.multiply(2, fo[...,1:-1,1:-1], out=fn[...,1:-1,1:-1])
+    numpy.subtract(fo[...,2:,1:-1], fn[...,1:-1,1:-1], out=fn[...,1:-1,1:-1])
+    numpy.add(fn[...,1:-1,1:-1], fo[...,0:-2,1:-1], out=fn[...,1:-1,1:-1])
+    numpy.multiply(1/dx**2, fn[...,1:-1,1:-1], out=fn[...,1:-1,1:-1])
+    numpy.multiply(2, fo[...,1:-1,1:-1], out=w)
+    numpy.subtract(fo[...,1:-1,2:], w, out=w)
+    numpy.add(w, fo[...,1:-1,0:-2], out=w)
+    numpy.multiply(1/dy**2, w, out=w)
+    numpy.add(fn[...,1:-1,1:-1], w, out=fn[...,1:-1,1:-1])
+    numpy.multiply(nu*dt, fn[...,1:-1,1:-1], out=fn[...,1:-1,1:-1])
+    numpy.add(fo[...,1:-1,1:-1], fn[...,1:-1,1:-1], out=fn[...,1:-1,1:-1])
+
+
+def conv_diff2d(fn, fo, uo, vo, nu, dt, dx, dy, w1, w2, fxm=None, fym=None):
+    # fn = fo + dt*(-uo/dx*(fo - fo[i-1,j]) - vo/dy*(fo - fo[i,j-1])
+    #               + nu*(1/dx**2*(fo[i+1,j] - 2*fo + fxm)
+    #                   + 1/dy**2*(fo[i,j+1] - 2*fo + fym)))
+    # fxm, fym default to fo[i-1,j], fo[i,j-1]
+    if fxm is None:
+        fxm = fo[...,0:-2,1:-1]
+    if fym is None:
+        fym = fo[...,1:-1,0:-2]
+    numpy.negative(uo[...,1:-1,1:-1], out=fn[...,1:-1,1:-1])
+    numpy.divide(fn[...,1:-1,1:-1], dx, out=fn[...,1:-1,1:-1])
+    numpy.subtract(fo[...,1:-1,1:-1], fo[...,0:-2,1:-1], out=w1)
+    numpy.multiply(fn[...,1:-1,1:-1], w1, out=fn[...,1:-1,1:-1])
+    numpy.divide(vo[...,1:-1,1:-1], dy, out=w1)
+    numpy.subtract(fo[...,1:-1,1:-1], fo[...,1:-1,0:-2], out=w2)
+    numpy.multiply(w1, w2, out=w1)
+    numpy.subtract(fn[...,1:-1,1:-1], w1, out=fn[...,1:-1,1:-1])
+    numpy.multiply(2, fo[...,1:-1,1:-1], out=w1)
+    numpy.subtract(fo[...,2:,1:-1], w1, out=w1)
+    numpy.add(w1, fxm, out=w1)
+    numpy.multiply(1/dx**2, w1, out=w1)
+    numpy.multiply(2, fo[...,1:-1,1:-1], out=w2)
+    numpy.subtract(fo[...,1:-1,2:], w2, out=w2)
+    numpy.add(w2, fym, out=w2)
+    numpy.multiply(1/dy**2, w2, out=w2)
+    numpy.add(w1, w2, out=w1)
+    numpy.multiply(nu, w1, out=w1)
+    numpy.add(fn[...,1:-1,1:-1], w1, out=fn[...,1:-1,1:-1])
+    numpy.multiply(dt, fn[...,1:-1,1:-1], out=fn[...,1:-1,1:-1])
+    numpy.add(fo[...,1:-1,1:-1], fn[...,1:-1,1:-1], out=fn[...,1:-1,1:-1])
+
+
+def dirichlet(f, value):
+    f[...,0,:] = value
+    f[...,-1,:] = value
+    f[...,:,0] = value
+    f[...,:,-1] = value
+
+
+# 3D: interior points only, x along axis 0
+##############################
+I3 = (Ellipsis, slice(1, -1), slice(1, -1), slice(1, -1))
+XM = (Ellipsis, slice(0, -2), slice(1, -1), slice(1, -1)) # [i-1,j,k]
+XP = (Ellipsis, slice(2, None), slice(1, -1), slice(1, -1))
+YM = (Ellipsis, slice(1, -1), slice(0, -2), slice(1, -1))
+YP = (Ellipsis, slice(1, -1), slice(2, None), slice(1, -1))
+ZM = (Ellipsis, slice(1, -1), slice(1, -1), slice(0, -2))
+ZP = (Ellipsis, slice(1, -1), slice(1, -1), slice(2, None))
+
+
+def lin_conv3d(fn, fo, c, dt, dx, dy, dz, w):
+    # fn = fo - c*dt/dx*(fo - fo[i-1]) - c*dt/dy*(fo - fo[j-1])
+    #         - c*dt/dz*(fo - fo[k-1])
+    numpy.subtract(fo[I3], fo[XM], out=fn[I3])
+    numpy.multiply(c*dt/dx, fn[I3], out=fn[I3])
+    numpy.subtract(fo[I3], fn[I3], out=fn[I3])
+    numpy.subtract(fo[I3], fo[YM], out=w)
+    numpy.multiply(c*dt/dy, w, out=w)
+    numpy.subtract(fn[I3], w, out=fn[I3])
+    numpy.subtract(fo[I3], fo[ZM], out=w)
+    numpy.multiply(c*dt/dz, w, out=w)
+    numpy.subtract(fn[I3], w, out=fn[I3])
+
+
+def diffusion3d(fn, fo, nu, dt, dx, dy, dz, w):
+    # fn = fo + nu*dt*(d2f/dx2 + d2f/dy2 + d2f/dz2)
+    numpy.multiply(2, fo[I3], out=fn[I3])
+    numpy.subtract(fo[XP], fn[I3], out=fn[I3])
+    numpy.add(fn[I3], fo[XM], out=fn[I3])
+    numpy.multiply(1/dx**2, fn[I3], out=fn[I3])
+    for p, m, d in ((YP, YM, dy), (ZP, ZM, dz)):
+        numpy.multiply(2, fo[I3], out=w)
+        numpy.subtract(fo[p], w, out=w)
+        numpy.add(w, fo[m], out=w)
+        numpy.multiply(1/d**2, w, out=w)
+        numpy.add(fn[I3], w, out=fn[I3])
+    numpy.multiply(nu*dt, fn[I3], out=fn[I3])
+    numpy.add(fo[I3], fn[I3], out=fn[I3])
+
+
+def conv_diff3d(fn, fo, uo, vo, wo, nu, dt, dx, dy, dz, w1, w2):
+    # fn = fo + dt*(-uo/dx*(fo - fo[i-1]) - vo/dy*(fo - fo[j-1])
+    #               - wo/dz*(fo - fo[k-1]) + nu*(d2f/dx2 + d2f/dy2 + d2f/dz2))
+    numpy.negative(uo[I3], out=fn[I3])
+    numpy.divide(fn[I3], dx, out=fn[I3])
+    numpy.subtract(fo[I3], fo[XM], out=w1)
+    numpy.multiply(fn[I3], w1, out=fn[I3])
+    for c, m, d in ((vo, YM, dy), (wo, ZM, dz)):
+        numpy.divide(c[I3], d, out=w1)
+        numpy.subtract(fo[I3], fo[m], out=w2)
+        numpy.multiply(w1, w2, out=w1)
+        numpy.subtract(fn[I3], w1, out=fn[I3])
+    numpy.multiply(2, fo[I3], out=w1)
+    numpy.subtract(fo[XP], w1, out=w1)
+    numpy.add(w1, fo[XM], out=w1)
+    numpy.multiply(1/dx**2, w1, out=w1)
+    for p, m, d in ((YP, YM, dy), (ZP, ZM, dz)):
+        numpy.multiply(2, fo[I3], out=w2)
+        numpy.subtract(fo[p], w2, out=w2)
+        numpy.add(w2, fo[m], out=w2)
+        numpy.multiply(1/d**2, w2, out=w2)
+        numpy.add(w1, w2, out=w1)
+    numpy.multiply(nu, w1, out=w1)
+    numpy.add(fn[I3], w1, out=fn[I3])
+    numpy.multiply(dt, fn[I3], out=fn[I3])
+    numpy.add(fo[I3], fn[I3], out=fn[I3])
+
+
+def dirichlet3d(f, value):
+    f[...,0,:,:] = value
+    f[...,-1,:,:] = value
+    f[...,:,0,:] = value
+    f[...,:,-1,:] = value
+    f[...,:,:,0] = value
+    f[...,:,:,-1] = value
@@ -0,0 +1,119 @@
+import json
+import time
+
+######################################################################
+# INSTRUMENTATION OF THE STEPPING AND ITERATION LOOPS                #
+######################################################################
+# A Metrics object collects wall time and call counts per phase of a
+# loop and the cell updates done, and calls the hooks registered for
+# the loop's events. Loops are instrumented only when they are given one
+# (solver.metrics = Metrics(), laplace2d(..., metrics=m)); without, they
+# do one `is not None` test per step.
+#
+# Phases:
+#   step    one time-step of advance() / advance_to(), one iteration
+#           (sweep, V-cycle, CG iteration) of the elliptic solvers
+#   bc      setting the boundary values, part of step
+#   check   evaluating the convergence norm of the elliptic solvers, after
+#           (and not part of) step
+#
+# Events, hook(*args):
+#   pre_step(solver or iteration)   before a step
+#   post_step(solver or iteration)  after it
+#   bc(fields)                      after the boundary values are set
+#   check(iteration, norm)          after a convergence norm
+#
+#   m = cfd.Metrics()
+#   m.on('post_step', lambda s: s.n % 1000 or print(s.n, s.t))
+#   solver.metrics = m
+#   solver.advance(nt)
+#   print(m.summary())
+#   m.save('metrics.json')
+
+EVENTS = ('pre_step', 'post_step', 'bc', 'check')
+
+
+class Metrics(object):
+    clock = staticmethod(time.perf_counter)
+
+    def __init__(self):
+        self.hooks = {e: [] for e in EVENTS}
+        self.reset()
+
+    def reset(self):
+        self.time = {}      # seconds per phase
+        self.calls = {}     # calls per phase
+        self.cells = 0      # cell updates (grid points x members per step)
+        self.norm = None    # (iteration, value) of the last check
+
+    def on(self, event, hook=None):
+        """Register hook for event, also usable as a decorator."""
+        if event not in self.hooks:
+            raise ValueError('unknown event %r, use one of %s'
+                             % (event, ', '.join(EVENTS)))
+        if hook is None:
+            return lambda hook: self.on(event, hook)
+        self.hooks[event].append(hook)
+        return hook
+
+    def emit(self, event, *args):
+        for hook in self.hooks[event]:
+            hook(*args)
+
+    def add(self, phase, seconds, calls=1):
+        self.time[phase] = self.time.get(phase, 0.) + seconds
+        self.calls[phase] = self.calls.get(phase, 0) + calls
+
+    # called by the loops
+    def begin(self, *args):
+        self.emit('pre_step', *args)
+        return self.clock()
+
+    def end(self, t0, cells, *args, steps=1):
+        self.add('step', self.clock() - t0, steps)
+        self.cells += cells
+        self.emit('post_step', *args)
+
+    def phase(self, name, t0, *args):
+        # time since t0 to phase name, its hooks get args; returns the time
+        t = self.clock()
+        self.add(name, t - t0)
+        self.emit(name, *args)
+        return t
+
+    def check(self, t0, it, norm):
+        self.norm = (it, float(norm))
+        return self.phase('check', t0, it, norm)
+
+    # results
+    @property
+    def steps(self):
+        return self.calls.get('step', 0)
+
+    @property
+    def rate(self):
+        """Cell updates per second of step time."""
+        t = self.time.get('step', 0.)
+        return self.cells/t if t else 0.
+
+    def as_dict(self):
+        return {'steps': self.steps, 'cells': self.cells, 'rate': self.rate,
+                'norm': self.norm,
+                'phases': {k: {'time': self.time[k], 'calls': self.calls[k],
+                               'mean': self.time[k]/self.calls[k]}
+                           for k in self.time}}
+
+    def save(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.as_dict(), f, indent=1)
+        return path
+
+    def summary(self):
+        lines = ['%-6s %10s %10s %12s' % ('phase', 'calls', 'time s',
+                                          'mean s')]
+        for k in self.time:
+            lines.append('%-6s %10d %10.4g %12.4g' % (
+                k, self.calls[k], self.time[k], self.time[k]/self.calls[k]))
+        lines.append('%d steps, %.4g cell updates/s' % (self.steps,
+                                                        self.rate))
+        return '\n'.join(lines)
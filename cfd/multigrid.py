@@ -0,0 +1,227 @@
+import numpy
+
+from . import convergence
+
+######################################################################
+# GEOMETRIC MULTIGRID FOR  d2p/dx2 + d2p/dy2 = b,  p stored (nx, ny)  #
+######################################################################
+# Boundary conditions are given per side in the order the scripts apply
+# them: bc = (x = xmin, x = xmax, y = ymin, y = ymax), i.e. the sides
+# p[0,:], p[-1,:], p[:,0], p[:,-1]. A side is either a Dirichlet value
+# (scalar or array along the side) or 'neumann' for dp/dn = 0, imposed as
+# in the scripts by copying the first interior line onto the boundary.
+#
+# The grids do not need 2**k+1 points: every coarse level has about half
+# the points of the finer one and the levels are connected by (bi)linear
+# interpolation (prolongation) and its scaled transpose (restriction),
+# which reduce to the usual linear interpolation / full weighting for
+# nested grids. All levels are of the floating point type of the finest
+# one (hierarchy(dtype=)).
+
+NEUMANN = 'neumann'
+
+
+def apply_bc(p, bc):
+    for side, value in zip(((0, slice(None)), (-1, slice(None)),
+                            (slice(None), 0), (slice(None), -1)), bc):
+        if isinstance(value, str):
+            # copy the neighbouring interior line: dp/dn = 0
+            inner = tuple(1 if s == 0 else -2 if s == -1 else s for s in side)
+            p[side] = p[inner]
+        else:
+            p[side] = value
+
+
+def homogeneous(bc):
+    return tuple(v if isinstance(v, str) else 0 for v in bc)
+
+
+def residual(p, b, dx, dy, r):
+    r[1:-1,1:-1] = b[1:-1,1:-1] - \
+            (p[2:,1:-1] - 2*p[1:-1,1:-1] + p[0:-2,1:-1])/dx**2 - \
+            (p[1:-1,2:] - 2*p[1:-1,1:-1] + p[1:-1,0:-2])/dy**2
+    r[0,:] = 0
+    r[-1,:] = 0
+    r[:,0] = 0
+    r[:,-1] = 0
+    return r
+
+
+def rb_sweep(p, b, dx, dy, bc, omega=1., colours=(0, 1)):
+    """One red-black Gauss-Seidel (omega = 1) or SOR sweep, the BCs are
+    applied after each colour. colours=(1, 0) is the backward sweep."""
+    nx, ny = p.shape
+    a = 1/(2*(dx**2+dy**2))
+    # red points have i+j even, black ones i+j odd
+    for colour in colours:
+        for i0 in (1, 2):
+            j0 = 1 + (i0 + 1 + colour) % 2
+            c = (slice(i0, nx-1, 2), slice(j0, ny-1, 2))
+            pn = ((p[i0+1:nx:2, j0:ny-1:2] + p[i0-1:nx-2:2, j0:ny-1:2])*dy**2 +
+                  (p[i0:nx-1:2, j0+1:ny:2] + p[i0:nx-1:2, j0-1:ny-2:2])*dx**2 -
+                  b[c]*dx**2*dy**2)*a
+            if omega == 1:
+                p[c] = pn
+            else:
+                p[c] += omega*(pn - p[c])
+        apply_bc(p, bc)
+
+
+# Grid transfer
+##############################
+class Transfer1D(object):
+    # linear interpolation from nc to nf points on the same interval
+    def __init__(self, nf, nc):
+        s = numpy.arange(nf)*(nc-1)/(nf-1)
+        self.i0 = numpy.minimum(s.astype(int), nc-2)
+        self.w = s - self.i0
+        self.starts = numpy.searchsorted(self.i0, numpy.arange(nc-1))
+        self.scale = (nc-1)/(nf-1)
+        self.nc = nc
+
+    def prolong(self, c, axis):
+        shape = [1, 1]
+        shape[axis] = -1
+        w = self.w.reshape(shape).astype(c.dtype, copy=False)
+        return c.take(self.i0, axis)*(1-w) + c.take(self.i0+1, axis)*w
+
+    def restrict(self, f, axis):
+        shape = [1, 1]
+        shape[axis] = -1
+        w = self.w.reshape(shape).astype(f.dtype, copy=False)
+        lo = numpy.add.reduceat(f*(1-w), self.starts, axis=axis)
+        hi = numpy.add.reduceat(f*w, self.starts, axis=axis)
+        cshape = list(f.shape)
+        cshape[axis] = self.nc
+        c = numpy.zeros(cshape, f.dtype)
+        idx = [slice(None), slice(None)]
+        idx[axis] = slice(0, -1)
+        c[tuple(idx)] += lo
+        idx[axis] = slice(1, None)
+        c[tuple(idx)] += hi
+        return c*self.scale
+
+
+def coarsen(n):
+    return (n+1)//2
+
+
+class Level(object):
+    def __init__(self, nx, ny, dx, dy, dtype=float):
+        self.nx, self.ny = nx, ny
+        self.dx, self.dy = dx, dy
+        self.r = numpy.zeros((nx, ny), dtype)
+
+
+def hierarchy(nx, ny, dx, dy, nmin=5, dtype=float):
+    lx, ly = dx*(nx-1), dy*(ny-1)
+    levels = [Level(nx, ny, dx, dy, dtype)]
+    while min(levels[-1].nx, levels[-1].ny) > nmin:
+        f = levels[-1]
+        cx, cy = coarsen(f.nx), coarsen(f.ny)
+        c = Level(cx, cy, lx/(cx-1), ly/(cy-1), dtype)
+        f.tx, f.ty = Transfer1D(f.nx, cx), Transfer1D(f.ny, cy)
+        levels.append(c)
+    return levels
+
+
+def restrict(f, level):
+    return level.ty.restrict(level.tx.restrict(f, 0), 1)
+
+
+def prolong(c, level):
+    return level.ty.prolong(level.tx.prolong(c, 0), 1)
+
+
+def fold_bc(rc, bc):
+    # transpose of apply_bc(., homogeneous(bc)) on a restricted residual:
+    # the weight a Neumann boundary point received belongs to the interior
+    # point it copies, Dirichlet boundary points drop out
+    if isinstance(bc[0], str):
+        rc[1,:] += rc[0,:]
+    if isinstance(bc[1], str):
+        rc[-2,:] += rc[-1,:]
+    if isinstance(bc[2], str):
+        rc[:,1] += rc[:,0]
+    if isinstance(bc[3], str):
+        rc[:,-2] += rc[:,-1]
+    rc[0,:] = rc[-1,:] = rc[:,0] = rc[:,-1] = 0
+    return rc
+
+
+def restrict_bc(bc, f, c):
+    # Dirichlet values along a side are interpolated onto the coarse points
+    out = []
+    for k, value in enumerate(bc):
+        if isinstance(value, str) or numpy.ndim(value) == 0:
+            out.append(value)
+        else:
+            nf, nc = (f.ny, c.ny) if k < 2 else (f.nx, c.nx)
+            out.append(numpy.interp(numpy.linspace(0, 1, nc),
+                                    numpy.linspace(0, 1, nf), value))
+    return tuple(out)
+
+
+# Cycles
+##############################
+# The post-smoothing sweeps run backwards (black, then red) and the
+# coarsest grid alternates forward and backward sweeps, which makes the
+# V-cycle a symmetric operator: it can precondition conjugate gradients.
+def vcycle(levels, k, p, b, bc, nu1=2, nu2=2, ncoarse=50):
+    lv = levels[k]
+    if k == len(levels)-1:
+        for i in range(ncoarse):
+            rb_sweep(p, b, lv.dx, lv.dy, bc,
+                     colours=(0, 1) if i % 2 == 0 else (1, 0))
+        return
+    for i in range(nu1):
+        rb_sweep(p, b, lv.dx, lv.dy, bc)
+    r = residual(p, b, lv.dx, lv.dy, lv.r)
+    rc = fold_bc(restrict(r, lv), bc)
+    ec = numpy.zeros_like(rc)
+    vcycle(levels, k+1, ec, rc, homogeneous(bc), nu1, nu2, ncoarse)
+    p += prolong(ec, lv)
+    apply_bc(p, bc)
+    for i in range(nu2):
+        rb_sweep(p, b, lv.dx, lv.dy, bc, colours=(1, 0))
+
+
+def fmg(levels, p, b, bc, **kw):
+    # full multigrid: solve on the coarsest grid, interpolate the solution
+    # to the next finer grid as initial guess and do one V-cycle there
+    bs, bcs = [b], [bc]
+    for k in range(len(levels)-1):
+        bs.append(restrict(bs[-1], levels[k]))
+        bcs.append(restrict_bc(bcs[-1], levels[k], levels[k+1]))
+    pc = numpy.zeros((levels[-1].nx, levels[-1].ny), p.dtype)
+    apply_bc(pc, bcs[-1])
+    vcycle(levels, len(levels)-1, pc, bs[-1], bcs[-1], **kw)
+    for k in range(len(levels)-2, -1, -1):
+        pc = prolong(pc, levels[k])
+        apply_bc(pc, bcs[k])
+        vcycle(levels, k, pc, bs[k], bcs[k], **kw)
+    p[:] = pc
+
+
+def solve(p, b, dx, dy, bc, tol=1e-8, maxiter=100, use_fmg=False,
+          monitor=None, metrics=None, **kw):
+    """Multigrid V-cycles until the L1 residual has dropped below tol times
+    the residual of a zero initial guess (or the criteria of monitor, a
+    convergence.Monitor). p is updated in place, returns (p, number of
+    V-cycles)."""
+    if monitor is None:
+        monitor = convergence.Monitor(tol, maxiter=maxiter)
+    levels = hierarchy(p.shape[0], p.shape[1], dx, dy, dtype=p.dtype)
+    r = levels[0].r
+    p0 = numpy.zeros_like(p)
+    apply_bc(p0, bc)
+    if monitor.reference(residual(p0, b, dx, dy, r)) == 0:
+        p[:] = p0
+        return p, 0
+    apply_bc(p, bc)
+    if use_fmg:
+        fmg(levels, p, b, bc, **kw)
+    return p, convergence.iterate(
+        monitor, lambda: residual(p, b, dx, dy, r),
+        lambda: vcycle(levels, 0, p, b, bc, **kw), metrics,
+        r[1:-1,1:-1].size)
@@ -0,0 +1,82 @@
+# Plotting helpers. matplotlib is only imported when this module is, the
+# numerics in the rest of the package do not need it.
+import numpy
+from matplotlib import pyplot # plotting
+from matplotlib import cm # colormap
+
+show = pyplot.show
+
+# surfaces are drawn with at most this many lines along an axis, finer
+# grids are downsampled through the strides (stride=None)
+MAXLINES = 100
+
+
+def auto_stride(shape, maxlines=MAXLINES):
+    return max(1, -(-max(shape)//maxlines))
+
+
+def plot_line(x, u, xlim=(0, 2), ylim=(0, 2.5)):
+    fig = pyplot.figure(figsize=(5, 3), dpi=100)
+    pyplot.xlim(*xlim)
+    pyplot.ylim(*ylim)
+    pyplot.plot(x, u)
+    return fig
+
+
+def plot_multi(x, solver, nt, incr, title, xlim=(0, 2), ylim=(0, 2.5),
+               exact=None):
+    # plot solver.u every incr steps while advancing it up to nt steps,
+    # exact(t) (if given) is drawn next to the numerical solution
+    fig = pyplot.figure(figsize=(9 if exact else 7, 5), dpi=100)
+    ax = pyplot.subplot(111)
+    colour = iter(cm.rainbow(numpy.linspace(0, 1, len(range(0, nt, incr)))))
+    for i in range(0, nt, incr):
+        c = next(colour)
+        if exact is None:
+            ax.plot(x, solver.u, c=c)
+        else:
+            ax.plot(x, solver.u, c=c, label='i='+str(i)+' numerical')
+            ax.plot(x, exact(solver.t), 'o', c=c, markerfacecolor='none',
+                    label='i='+str(i)+' analytical')
+        solver.advance(incr)
+    if exact is not None:
+        box = ax.get_position()
+        ax.set_position([box.x0, box.y0, box.width*0.97, box.height])
+        ax.legend(bbox_to_anchor=(1.02,1), loc=2, fontsize=12)
+    pyplot.xlabel('x (m)')
+    pyplot.ylabel('u (m/s)')
+    pyplot.xlim(*xlim)
+    if ylim is not None:
+        pyplot.ylim(*ylim)
+    pyplot.title(title)
+    return fig
+
+
+def plot_surf(x, y, u, v, title, stride=2, cmap=cm.coolwarm, zlim=None):
+    fig = pyplot.figure(figsize=(10, 3), dpi=100)
+    X, Y = numpy.meshgrid(x, y, indexing='ij')
+    if stride is None:
+        stride = auto_stride(u.shape)
+    for k, f in enumerate((u, v)):
+        ax = fig.add_subplot(1, 2, k+1, projection='3d')
+        ax.plot_surface(X, Y, f, rstride=stride, cstride=stride, cmap=cmap,
+                        linewidth=0, antialiased=False)
+        if zlim is not None:
+            ax.set_zlim(*zlim)
+    pyplot.suptitle(title)
+    return fig
+
+
+def plot2d(x, y, p, title, figsize=(11, 7), stride=None):
+    fig = pyplot.figure(figsize=figsize, dpi=100)
+    ax = fig.add_subplot(projection='3d')
+    X, Y = numpy.meshgrid(x, y, indexing='ij')
+    if stride is None:
+        stride = auto_stride(p.shape)
+    ax.plot_surface(X, Y, p, rstride=stride, cstride=stride, cmap=cm.coolwarm,
+                    linewidth=0, antialiased=False)
+    ax.set_xlim(x[0], x[-1])
+    ax.set_ylim(y[0], y[-1])
+    ax.view_init(30,225)
+    pyplot.title(title)
+    return fig
@@ -0,0 +1,158 @@
+import argparse
+import concurrent.futures
+import glob
+import multiprocessing
+import os
+
+import numpy
+
+from . import snapshots
+
+######################################################################
+# HEADLESS RENDERING OF SNAPSHOT DIRECTORIES                         #
+######################################################################
+# Figures are drawn from a snapshot directory (cfd.snapshots) after the
+# run, not while stepping: the solver never waits for matplotlib. Every
+# worker process switches matplotlib to the off-screen Agg backend and
+# opens the directory once (a memory map, no copy), then renders the
+# frames it is given to frame_00000.png, ... in outdir.
+#
+#   kind='surf'   plot_surf of u and v (2D) or plot_line of u (1D), the
+#                 surfaces downsampled to at most maxlines lines per axis
+#   kind='image'  one image per field (imshow), every `step`-th cell so
+#                 that at most maxlines*4 pixels per axis are drawn
+#
+# 3D snapshots are drawn as their mid-plane z = z[nz//2].
+#
+# The axis (colour) limits are those of all frames, computed once before
+# rendering, so the frames of an animation are comparable. gif= assembles
+# the frames into an animated GIF (needs Pillow).
+#
+#   python -m cfd.render run08 frames08 --every 5 --gif run08.gif -j 8
+
+state = {}
+
+
+def setup(path, kind, lims, maxlines, dpi):
+    # worker initializer
+    import matplotlib
+    matplotlib.use('Agg')
+    from . import plotting
+    state.update(snaps=snapshots.load(path), kind=kind, lims=lims,
+                 maxlines=maxlines, dpi=dpi, plotting=plotting)
+
+
+def plane(grid, f):
+    # the fields f (nfields, *shape) of a 3D grid at the mid-plane in z,
+    # (nfields, nx, ny), a view; 1D and 2D fields as they are
+    return f[...,grid.nz//2] if len(grid.shape) == 3 else f
+
+
+def limits(snaps, frames):
+    # (min, max) over the given frames, of each field (of its mid-plane)
+    lo = numpy.full(len(snaps.names), numpy.inf)
+    hi = -lo
+    for k in frames:
+        f = plane(snaps.grid, snaps.fields[k])
+        lo = numpy.minimum(lo, f.reshape(len(f), -1).min(axis=1))
+        hi = numpy.maximum(hi, f.reshape(len(f), -1).max(axis=1))
+    return list(zip(lo, hi))
+
+
+def title(snaps, k):
+    t = snaps.t[k]
+    s = 'n = %d' % snaps.n[k] if numpy.isnan(t) else \
+        't = %.4g (n = %d)' % (t, snaps.n[k])
+    if len(snaps.grid.shape) == 3:
+        s += ', z = %.4g' % snaps.grid.z[snaps.grid.nz//2]
+    return s
+
+
+def frame(k, out):
+    s = state['snaps']
+    plotting, pyplot = state['plotting'], state['plotting'].pyplot
+    grid, f, lims = s.grid, plane(s.grid, s.fields[k]), state['lims']
+    if state['kind'] == 'image':
+        step = plotting.auto_stride(grid.shape[:2], 4*state['maxlines'])
+        fig, axes = pyplot.subplots(1, len(s.names), squeeze=False,
+                                    figsize=(5*len(s.names), 4))
+        for ax, name, field, (lo, hi) in zip(axes[0], s.names, f, lims):
+            if field.ndim == 1:
+                ax.plot(grid.x[::step], field[::step])
+                ax.set_ylim(lo, hi)
+            else:
+                im = ax.imshow(field[::step,::step].T, origin='lower',
+                               extent=(grid.xmin, grid.xmax,
+                                       grid.ymin, grid.ymax),
+                               vmin=lo, vmax=hi, cmap='coolwarm')
+                fig.colorbar(im, ax=ax)
+            ax.set_title(name)
+        fig.suptitle(title(s, k))
+    elif f[0].ndim == 1:
+        lo, hi = lims[0]
+        fig = plotting.plot_line(grid.x, f[0], xlim=(grid.xmin, grid.xmax),
+                                 ylim=(lo, hi + .05*(hi - lo or 1)))
+        pyplot.title(title(s, k))
+    else:
+        lo, hi = min(l[0] for l in lims[:2]), max(l[1] for l in lims[:2])
+        stride = plotting.auto_stride(grid.shape[:2], state['maxlines'])
+        fig = plotting.plot_surf(grid.x, grid.y, f[0], f[:2][-1],
+                                 title(s, k), stride=stride, zlim=(lo, hi))
+    fig.savefig(out, dpi=state['dpi'])
+    pyplot.close(fig)
+    return out
+
+
+def render(path, outdir, every=1, frames=None, kind='surf', workers=None,
+           maxlines=100, dpi=100, gif=None, fps=10):
+    """Render the snapshots in path (every `every`-th, or the indices in
+    frames) to PNG files in outdir on workers processes; returns the file
+    names."""
+    snaps = snapshots.load(path)
+    frames = list(range(0, len(snaps), every) if frames is None else frames)
+    os.makedirs(outdir, exist_ok=True)
+    for old in glob.glob(os.path.join(outdir, 'frame_*.png')):
+        os.unlink(old)
+    outs = [os.path.join(outdir, 'frame_%05d.png' % i)
+            for i in range(len(frames))]
+    lims = limits(snaps, frames)
+    workers = min(workers or multiprocessing.cpu_count(), len(frames)) or 1
+    chunksize = max(1, len(frames)//(4*workers))
+    with concurrent.futures.ProcessPoolExecutor(
+            workers, initializer=setup,
+            initargs=(path, kind, lims, maxlines, dpi)) as pool:
+        list(pool.map(frame, frames, outs, chunksize=chunksize))
+    if gif is not None:
+        animate(outs, gif, fps)
+    return outs
+
+
+def animate(files, out, fps=10):
+    """Assemble the image files into an animated GIF."""
+    from PIL import Image
+    images = [Image.open(f) for f in files]
+    images[0].save(out, save_all=True, append_images=images[1:],
+                   duration=int(1000/fps), loop=0)
+    return out
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(prog='python -m cfd.render',
+                                description=render.__doc__)
+    p.add_argument('path', help='snapshot directory')
+    p.add_argument('outdir', help='directory for the PNG frames')
+    p.add_argument('--every', type=int, default=1)
+    p.add_argument('--kind', choices=('surf', 'image'), default='surf')
+    p.add_argument('--maxlines', type=int, default=100)
+    p.add_argument('--dpi', type=int, default=100)
+    p.add_argument('--gif', help='also write an animated GIF')
+    p.add_argument('--fps', type=float, default=10)
+    p.add_argument('-j', '--workers', type=int)
+    a = p.parse_args(argv)
+    outs = render(a.path, a.outdir, a.every, kind=a.kind, workers=a.workers,
+                  maxlines=a.maxlines, dpi=a.dpi, gif=a.gif, fps=a.fps)
+    print('%d frames in %s' % (len(outs), a.outdir))
+
+
+if __name__ == '__main__':
+    main()
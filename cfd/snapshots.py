@@ -0,0 +1,189 @@
+import json
+import os
+import queue
+import threading
+
+import numpy
+from numpy.lib import format as npformat
+
+from . import grid as _grid
+
+######################################################################
+# SNAPSHOT TIME-SERIES ON DISK                                       #
+######################################################################
+# A snapshot directory holds the fields of a solver at a series of
+# time-steps:
+#   meta.json         field names, grid, number of snapshots, layout
+#   times.npy         (nsnap, 2): t and step count n of every snapshot
+#   fields.npy        (nsnap, nfields, *shape), preallocated and filled
+#                     through a memory map; load() maps it read-only, no
+#                     copy
+# or, with chunk=k, instead of fields.npy
+#   chunk_00000.npz   k snapshots per file, zlib-compressed; load() reads
+#                     a chunk when one of its snapshots is accessed
+#
+# Writer.write() only copies the fields into a queue, a background thread
+# does the disk writes (and compression) so the stepping loop does not
+# wait for the disk. The queue holds at most `depth` snapshots: if the
+# disk cannot keep up, write() waits instead of filling the memory.
+#
+#   with Writer('run08', solver, nsnap=nt//10+1) as w:
+#       w.stream(nt, every=10)
+#   s = load('run08')
+#   s['u'][-1]          # u of the last snapshot, a view of the file
+
+
+class Writer(object):
+    def __init__(self, path, solver, nsnap, chunk=None, depth=8):
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self.solver = solver
+        self.nsnap = nsnap
+        self.chunk = chunk
+        self.shape = (len(solver.names),) + solver.fields[0].shape
+        self.count = 0
+        self.times = numpy.zeros((nsnap, 2))
+        if chunk is None:
+            self.fields = npformat.open_memmap(
+                os.path.join(path, 'fields.npy'), mode='w+',
+                dtype=solver.dtype, shape=(nsnap,) + self.shape)
+        else:
+            self.pending = []
+        self.error = None
+        self.queue = queue.Queue(depth)
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def write(self):
+        """Queue a copy of the solver's current fields."""
+        if self.error is not None:
+            raise self.error
+        if self.count >= self.nsnap:
+            raise ValueError('all %d snapshots are written' % self.nsnap)
+        s = self.solver
+        # per-member times of an ensemble with per-member dt are not kept
+        self.times[self.count] = (s.t if numpy.ndim(s.t) == 0 else numpy.nan,
+                                  s.n)
+        self.queue.put((self.count, numpy.array(s.fields)))
+        self.count += 1
+
+    def stream(self, nt, every=1):
+        """Write the current fields, then advance the solver nt steps and
+        write every `every` steps."""
+        self.write()
+        for i in range(every, nt+1, every):
+            self.solver.advance(every)
+            self.write()
+        self.solver.advance(nt % every)
+        return self.solver
+
+    def run(self):
+        # background thread: write the queued snapshots
+        while True:
+            item = self.queue.get()
+            if item is None:
+                break
+            if self.error is not None:
+                continue
+            try:
+                k, fields = item
+                if self.chunk is None:
+                    self.fields[k] = fields
+                else:
+                    self.pending.append(fields)
+                    if len(self.pending) == self.chunk:
+                        self.flush_chunk(k)
+            except Exception as e: # raised by the next write() or close()
+                self.error = e
+
+    def flush_chunk(self, k):
+        numpy.savez_compressed(
+            os.path.join(self.path, 'chunk_%05d.npz' % (k//self.chunk)),
+            fields=numpy.array(self.pending))
+        self.pending = []
+
+    def close(self):
+        if self.thread is None:
+            return
+        self.queue.put(None)
+        self.thread.join()
+        self.thread = None
+        if self.chunk is None:
+            self.fields.flush()
+            del self.fields
+        elif self.pending and self.error is None:
+            self.flush_chunk(self.count-1)
+        numpy.save(os.path.join(self.path, 'times.npy'),
+                   self.times[:self.count])
+        with open(os.path.join(self.path, 'meta.json'), 'w') as f:
+            json.dump({'names': list(self.solver.names),
+                       'shape': list(self.shape[1:]),
+                       'grid': _grid.describe(self.solver.grid),
+                       'count': self.count, 'nsnap': self.nsnap,
+                       'chunk': self.chunk}, f)
+        if self.error is not None:
+            raise self.error
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class Snapshots(object):
+    """A snapshot directory opened for reading: fields[k] (nfields, *shape)
+    of snapshot k, s['u'] all snapshots of u, t and n the times and step
+    counts, grid the grid of the run."""
+
+    def __init__(self, path):
+        with open(os.path.join(path, 'meta.json')) as f:
+            meta = json.load(f)
+        self.path = path
+        self.names = tuple(meta['names'])
+        self.grid = _grid.rebuild(*meta['grid'])
+        self.chunk = meta['chunk']
+        self.count = meta['count']
+        times = numpy.load(os.path.join(path, 'times.npy'))
+        self.t, self.n = times[:,0], times[:,1].astype(int)
+        if self.chunk is None:
+            # zero-copy: the unwritten tail of the preallocated file is cut
+            self.fields = numpy.load(os.path.join(path, 'fields.npy'),
+                                     mmap_mode='r')[:self.count]
+        else:
+            self.fields = Chunks(path, self.chunk, self.count)
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, name):
+        k = self.names.index(name)
+        if self.chunk is None:
+            return self.fields[:,k]
+        return numpy.array([self.fields[i][k] for i in range(self.count)])
+
+
+class Chunks(object):
+    # the snapshots of a chunked directory, one chunk in memory at a time
+    def __init__(self, path, chunk, count):
+        self.path, self.chunk, self.count = path, chunk, count
+        self.loaded = (None, None)
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, k):
+        if k < 0:
+            k += self.count
+        if not 0 <= k < self.count:
+            raise IndexError(k)
+        c = k//self.chunk
+        if self.loaded[0] != c:
+            with numpy.load(os.path.join(self.path,
+                                         'chunk_%05d.npz' % c)) as f:
+                self.loaded = (c, f['fields'])
+        return self.loaded[1][k % self.chunk]
+
+
+def load(path):
+    return Snapshots(path)
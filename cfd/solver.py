@@ -0,0 +1,587 @@
+import concurrent.futures
+
+import numpy
+
+from . import fused as _fused
+from . import halo as _halo
+from . import implicit, kernels
+from . import tiling as _tiling
+
+
+# time integration schemes: number of stage buffers
+SCHEMES = {'euler': 0, 'ssprk2': 1, 'ssprk3': 2}
+
+
+def blend(new, old, b):
+    # new = (1-b)*old + b*new in place; where new == old it stays exact
+    for fn, fo in zip(new, old):
+        numpy.subtract(fn, fo, out=fn)
+        numpy.multiply(fn, b, out=fn)
+        numpy.add(fn, fo, out=fn)
+
+
+class Solver(object):
+    """Explicit time-stepping of one or more fields on a grid.
+
+    The solver owns two buffers per field which swap roles every
+    time-step (ping-pong), the kernels write the new time-step straight
+    into the target buffer. Always read the fields through the solver
+    (solver.u, solver.fields) after advance(), the buffers swap.
+
+    Ensembles: fields with leading batch axes, e.g. (nbatch, nx), and
+    parameters given as arrays of shape (nbatch,) step all members at
+    once. Fields without batch axes are copied to every member.
+
+    Time integration (solver.scheme): 'euler' (forward Euler, step()),
+    'ssprk2' or 'ssprk3', the strong-stability-preserving Runge-Kutta
+    schemes of Shu and Osher. They are convex combinations of Euler steps,
+    so they reuse step() with the same stable dt and need one ('ssprk2')
+    or two ('ssprk3') preallocated stage buffers per field.
+
+    Layout: the buffers are C-ordered whatever the order of the given
+    fields, the last grid axis is the contiguous one.
+
+    Precision: the solver steps in the floating point type of the fields,
+    e.g. float32 fields (grid.zeros(numpy.float32)) give float32 buffers
+    and kernels; integer fields are promoted to float64.
+
+    Instrumentation: with solver.metrics set to a cfd.Metrics, the
+    time-steps of advance() and advance_to() (and the boundary values of
+    the 2D solvers) are timed and its hooks are called.
+    """
+
+    names = ('u',)
+    scheme = 'euler'
+    metrics = None
+
+    def __init__(self, grid, dt, *fields, **params):
+        if len(fields) != len(self.names):
+            raise ValueError('%s needs the fields %s'
+                             % (type(self).__name__, ', '.join(self.names)))
+        self.grid = grid
+        self.dtype = numpy.result_type(*[numpy.asarray(f).dtype
+                                         for f in fields], numpy.float32)
+        self.params = tuple(params)
+        self.dt = self.param(dt)
+        for name, value in params.items():
+            setattr(self, name, self.param(value))
+        # ensemble: leading axes of the fields and parameters form the batch
+        nd = len(grid.shape)
+        self.batch = numpy.broadcast_shapes(
+            *[numpy.shape(f)[:numpy.ndim(f)-nd] for f in fields],
+            *[numpy.shape(p)[:numpy.ndim(p)-nd]
+              for p in [self.dt] + [getattr(self, k) for k in params]])
+        self.t = 0.
+        self.n = 0
+        self.cur = [self.layout(numpy.array(
+                        numpy.broadcast_to(f, self.batch + grid.shape),
+                        dtype=self.dtype, order='C')) for f in fields]
+        self.nxt = [f.copy() for f in self.cur] # carries the boundary values
+        self.work = self.alloc_work()
+
+    def param(self, value):
+        # scalars are used as given, arrays hold one value per ensemble
+        # member and get trailing axes to broadcast against the grid
+        if numpy.ndim(value) == 0:
+            return value
+        value = numpy.asarray(value, dtype=self.dtype)
+        return value.reshape(value.shape + (1,)*len(self.grid.shape))
+
+    def layout(self, f):
+        # the buffer holding field f
+        return f
+
+    def alloc_work(self):
+        return []
+
+    @property
+    def fields(self):
+        return tuple(self.cur)
+
+    def __getattr__(self, name):
+        if name in type(self).names:
+            return self.fields[type(self).names.index(name)]
+        raise AttributeError(name)
+
+    def step(self, new, old):
+        raise NotImplementedError
+
+    def integrate(self, new, old):
+        # one time-step of the scheme from old into new
+        if self.scheme == 'euler':
+            self.step(new, old)
+            return
+        if self.scheme not in SCHEMES:
+            raise ValueError('unknown scheme %r, use one of %s'
+                             % (self.scheme, ', '.join(SCHEMES)))
+        if len(getattr(self, 'stages', ())) < SCHEMES[self.scheme]:
+            # copies of the fields: they carry the boundary values
+            self.stages = [[f.copy() for f in self.cur]
+                           for k in range(SCHEMES[self.scheme])]
+        s1 = self.stages[0]
+        self.step(s1, old)                  # u1 = u + dt*L(u)
+        if self.scheme == 'ssprk2':
+            self.step(new, s1)
+            blend(new, old, 1/2)            # 1/2 u + 1/2 (u1 + dt*L(u1))
+        else:
+            s2 = self.stages[1]
+            self.step(s2, s1)
+            blend(s2, old, 1/4)             # 3/4 u + 1/4 (u1 + dt*L(u1))
+            self.step(new, s2)
+            blend(new, old, 2/3)            # 1/3 u + 2/3 (u2 + dt*L(u2))
+
+    def advance(self, nt):
+        m = self.metrics
+        for n in range(0,nt):   # loop over all time-steps
+            if m is not None:
+                t0 = m.begin(self)
+            self.integrate(self.nxt, self.cur)
+            self.cur, self.nxt = self.nxt, self.cur
+            self.t += self.dt
+            self.n += 1
+            if m is not None:
+                m.end(t0, self.fields[0].size, self)
+        return self
+
+    # Adaptive time-steps
+    ##############################
+    def stable_dt(self):
+        """Largest stable time-step for the current fields: the CFL limit
+        of the convective and diffusive terms, a float, or an array with
+        one value per ensemble member."""
+        raise NotImplementedError
+
+    def amax(self, f):
+        # max |f| over the grid axes, per ensemble member
+        # without the temporary of abs(f): max(max f, -min f)
+        if not self.batch:
+            return float(max(f.max(), -f.min()))
+        axes = tuple(range(-len(self.grid.shape), 0))
+        return numpy.maximum(f.max(axis=axes, keepdims=True),
+                             -f.min(axis=axes, keepdims=True))
+
+    def advance_to(self, tmax, safety=0.9):
+        """Step up to t = tmax with dt = safety*stable_dt() recomputed every
+        step, the last step is shortened to land on tmax exactly. The
+        solver's fixed dt is restored afterwards."""
+        dt0 = self.dt
+        m = self.metrics
+        try:
+            while numpy.any(self.t < tmax):
+                if m is not None:
+                    t0 = m.begin(self)
+                dt = numpy.minimum(safety*self.stable_dt(), tmax - self.t)
+                if not self.batch:
+                    dt = float(numpy.min(dt))
+                self.dt = dt
+                self.integrate(self.nxt, self.cur)
+                self.cur, self.nxt = self.nxt, self.cur
+                t = numpy.where(dt >= tmax - self.t, tmax, self.t + dt)
+                self.t = t if self.batch else float(t)
+                self.n += 1
+                if m is not None:
+                    m.end(t0, self.fields[0].size, self)
+        finally:
+            self.dt = dt0
+        return self
+
+
+# 1D: periodic BC
+######################################################################
+class LinConv1D(Solver):
+    def __init__(self, grid, u, c, dt):
+        Solver.__init__(self, grid, dt, u, c=c)
+
+    def step(self, new, old):
+        kernels.lin_conv(new[0], old[0], self.c, self.dt, self.grid.dx)
+
+    def stable_dt(self):
+        return self.grid.dx/numpy.abs(self.c)
+
+
+class NonlConv1D(Solver):
+    def __init__(self, grid, u, dt):
+        Solver.__init__(self, grid, dt, u)
+
+    def alloc_work(self):
+        return [numpy.empty(self.batch + self.grid.shape, self.dtype)]
+
+    def step(self, new, old):
+        kernels.nonl_conv(new[0], old[0], self.dt, self.grid.dx, *self.work)
+
+    def stable_dt(self):
+        return self.grid.dx/self.amax(self.cur[0])
+
+
+class Diffusion1D(Solver):
+    # scheme 'cn': Crank-Nicolson, unconditionally stable, the periodic
+    # (cyclic) tridiagonal matrix is factored once per dt (implicit.py)
+    def __init__(self, grid, u, nu, dt):
+        Solver.__init__(self, grid, dt, u, nu=nu)
+
+    def step(self, new, old):
+        kernels.diffusion(new[0], old[0], self.nu, self.dt, self.grid.dx)
+
+    def integrate(self, new, old):
+        if self.scheme != 'cn':
+            return Solver.integrate(self, new, old)
+        if numpy.ndim(self.nu) or numpy.ndim(self.dt):
+            raise ValueError('Crank-Nicolson needs scalar nu and dt')
+        # (1 - r/2 L) new = (1 + r/2 L) old,  r = nu*dt/dx**2
+        r = self.nu*self.dt/self.grid.dx**2
+        kernels.diffusion(new[0], old[0], self.nu/2, self.dt, self.grid.dx)
+        implicit.factor(self.grid.nx, -r/2, 1+r, -r/2,
+                        periodic=True).solve(new[0], out=new[0])
+
+    def stable_dt(self):
+        return self.grid.dx**2/(2*self.nu)
+
+
+class Burgers1D(Solver):
+    def __init__(self, grid, u, nu, dt):
+        Solver.__init__(self, grid, dt, u, nu=nu)
+
+    def alloc_work(self):
+        return [numpy.empty(self.batch + self.grid.shape, self.dtype)]
+
+    def step(self, new, old):
+        kernels.burgers(new[0], old[0], self.nu, self.dt, self.grid.dx,
+                        *self.work)
+
+    def stable_dt(self):
+        dx = self.grid.dx
+        return 1/(self.amax(self.cur[0])/dx + 2*self.nu/dx**2)
+
+
+# 2D: fields (u, v) on (nx, ny)
+######################################################################
+class Solver2D(Solver):
+    # interior() updates the interior points of new from old, any views
+    # of the fields work (see decomp.py); bc is the Dirichlet value of the
+    # walls, None: the boundaries keep their values, 'periodic' or
+    # 'neumann': the buffers are padded with a ghost-cell halo (halo.py),
+    # interior() then updates every grid point and the halo is filled
+    # after it.
+    # tile: rows of the strips interior() runs on, one after the other
+    # (tiling.py); None: cache-sized, 0: all rows at once. threads > 1
+    # runs the strips on a pool of threads, shut down by close() (or at
+    # the end of a with block) and when a step runs without it.
+    names = ('u', 'v')
+    nwork = 1
+    bc = None
+    tile = None
+    threads = 1
+    fused = False   # one compiled pass (ConvDiff2D), not tiled
+    strips = None
+    pool = None
+    dirichlet = staticmethod(kernels.dirichlet)
+
+    def __init__(self, grid, dt, *fields, bc=None, **params):
+        self.bc = bc # before the buffers, it sets their layout
+        Solver.__init__(self, grid, dt, *fields, **params)
+
+    @property
+    def halo(self):
+        return self.bc if isinstance(self.bc, str) else None
+
+    def layout(self, f):
+        return f if self.halo is None else _halo.pad(f, self.halo)
+
+    @property
+    def fields(self):
+        if self.halo is None:
+            return tuple(self.cur)
+        return tuple(_halo.interior(f) for f in self.cur)
+
+    def tiles(self):
+        # [lo, hi) rows (slabs of the first grid axis) of the interior()
+        # calls of a step and the rows the work arrays need
+        compiled = self.compiled()
+        key = (self.tile, compiled)
+        if self.strips is None or self.strips[0] != key:
+            nd = len(self.grid.shape)
+            nx = self.cur[0].shape[-nd]
+            rows = self.tile
+            if rows is None and not compiled:
+                rows = _tiling.rows(self.cur[0].shape, self.dtype.itemsize,
+                                    2*len(self.names) + self.nwork, nd)
+            rows = min(rows or nx-2, nx-2)
+            self.strips = (key, _tiling.strips(1, nx-1, rows),
+                           0 if compiled else rows)
+        return self.strips[1:]
+
+    def compiled(self):
+        # interior() is one compiled pass over the fields (not tiled)
+        return False
+
+    def alloc_work(self):
+        nd = len(self.grid.shape)
+        inner = tuple(n-2 for n in self.cur[0].shape[1-nd:])
+        rows = self.tiles()[1]
+        return [numpy.empty(self.batch + (rows,) + inner, self.dtype)
+                for i in range(self.nwork)]
+
+    def step(self, new, old):
+        strips, rows = self.tiles()
+        if self.work[0].shape[-len(self.grid.shape)] < rows: # tile changed
+            self.work = self.alloc_work()
+        if len(strips) > 1 and self.threads > 1:
+            self.parallel(new, old, strips, rows)
+        else:
+            self.close()
+            if len(strips) == 1:
+                self.interior(new, old, self.work)
+            else:
+                for lo, hi in strips:
+                    self.slab(new, old, lo, hi, self.work)
+        if self.bc is not None:
+            m = self.metrics
+            if m is not None:
+                t0 = m.clock()
+            for f in new:
+                if self.halo is None:
+                    self.dirichlet(f, self.bc)
+                else:
+                    _halo.fill(f, self.halo)
+            if m is not None:
+                m.phase('bc', t0, new)
+
+    def slab(self, new, old, lo, hi, work):
+        # interior() of the rows [lo, hi)
+        nd = len(self.grid.shape)
+        self.interior([_tiling.slab(f, lo-1, hi+1, nd) for f in new],
+                      [_tiling.slab(f, lo-1, hi+1, nd) for f in old],
+                      [_tiling.slab(w, 0, hi-lo, nd) for w in work])
+
+    def parallel(self, new, old, strips, rows):
+        # one contiguous group of strips per thread, each thread with its
+        # own work arrays; numpy releases the GIL in the kernels
+        n = min(self.threads, len(strips))
+        if self.pool is None or self.pool[0] != (n, rows):
+            if self.pool is not None:
+                self.pool[1].shutdown()
+            self.pool = ((n, rows), concurrent.futures.ThreadPoolExecutor(n),
+                         [self.work] + [self.alloc_work()
+                                        for i in range(n-1)])
+        pool, works = self.pool[1:]
+        groups = numpy.array_split(numpy.arange(len(strips)), n)
+        def run(g):
+            for k in groups[g]:
+                self.slab(new, old, *strips[k], works[g])
+        list(pool.map(run, range(n)))
+
+    def close(self):
+        # shut down the thread pool, the next threaded step starts another
+        if self.pool is not None:
+            self.pool[1].shutdown()
+            self.pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def interior(self, new, old, work):
+        raise NotImplementedError
+
+
+class LinConv2D(Solver2D):
+    # Boundary condition: None (the walls keep their values), Dirichlet
+    # u = v = bc, 'periodic' or 'neumann'
+    def __init__(self, grid, u, v, c, dt, bc=None):
+        Solver2D.__init__(self, grid, dt, u, v, bc=bc, c=c)
+
+    def interior(self, new, old, work):
+        g = self.grid
+        for fn, fo in zip(new, old):
+            kernels.lin_conv2d(fn, fo, self.c, self.dt, g.dx, g.dy, *work)
+
+    def stable_dt(self):
+        g = self.grid
+        return 1/(numpy.abs(self.c)/g.dx + numpy.abs(self.c)/g.dy)
+
+
+class NonlConv2D(Solver2D):
+    # Boundary condition: as LinConv2D
+    nwork = 2
+
+    def __init__(self, grid, u, v, dt, bc=None):
+        Solver2D.__init__(self, grid, dt, u, v, bc=bc)
+
+    def interior(self, new, old, work):
+        g = self.grid
+        uo, vo = old
+        for fn, fo in zip(new, old):
+            kernels.nonl_conv2d(fn, fo, uo, vo, self.dt, g.dx, g.dy, *work)
+
+    def stable_dt(self):
+        g = self.grid
+        u, v = self.fields
+        return 1/(self.amax(u)/g.dx + self.amax(v)/g.dy)
+
+
+class Diffusion2D(Solver2D):
+    # Boundary condition: Dirichlet u = v = bc, or 'periodic' / 'neumann'
+    # (not with ADI, nor bc=None)
+    # scheme 'adi': Peaceman-Rachford alternating direction implicit, one
+    # batch of tridiagonal solves along x, then along y per step; the
+    # matrices are factored once per dt (implicit.py)
+    def __init__(self, grid, u, v, nu, dt, bc=1.):
+        Solver2D.__init__(self, grid, dt, u, v, bc=bc, nu=nu)
+
+    def integrate(self, new, old):
+        if self.scheme != 'adi':
+            return Solver2D.integrate(self, new, old)
+        if numpy.ndim(self.nu) or numpy.ndim(self.dt):
+            raise ValueError('ADI needs scalar nu and dt')
+        if self.halo is not None or self.bc is None:
+            raise ValueError('ADI needs Dirichlet walls')
+        g = self.grid
+        rx, ry = self.nu*self.dt/g.dx**2, self.nu*self.dt/g.dy**2
+        tx = implicit.factor(g.nx-2, -rx/2, 1+rx, -rx/2)
+        ty = implicit.factor(g.ny-2, -ry/2, 1+ry, -ry/2)
+        if getattr(self, 'plane', None) is None: # the work arrays are strips
+            self.plane = numpy.empty(self.batch + (g.nx-2, g.ny-2), self.dtype)
+        w = self.plane
+        for fn, fo in zip(new, old):
+            # (1 - rx/2 Dxx) f* = (1 + ry/2 Dyy) fo, f* stored in fn
+            numpy.multiply(-2, fo[...,1:-1,1:-1], out=w)
+            w += fo[...,1:-1,2:]
+            w += fo[...,1:-1,0:-2]
+            w *= ry/2
+            w += fo[...,1:-1,1:-1]
+            w[...,0,:] += rx/2*self.bc # walls x = xmin, xmax
+            w[...,-1,:] += rx/2*self.bc
+            tx.solve(w, axis=-2, out=fn[...,1:-1,1:-1])
+            kernels.dirichlet(fn, self.bc)
+            # (1 - ry/2 Dyy) fn = (1 + rx/2 Dxx) f*
+            numpy.multiply(-2, fn[...,1:-1,1:-1], out=w)
+            w += fn[...,2:,1:-1]
+            w += fn[...,0:-2,1:-1]
+            w *= rx/2
+            w += fn[...,1:-1,1:-1]
+            w[...,:,0] += ry/2*self.bc # walls y = ymin, ymax
+            w[...,:,-1] += ry/2*self.bc
+            ty.solve(w, axis=-1, out=fn[...,1:-1,1:-1])
+
+    def interior(self, new, old, work):
+        g = self.grid
+        for fn, fo in zip(new, old):
+            kernels.diffusion2d(fn, fo, self.nu, self.dt, g.dx, g.dy, *work)
+
+    def stable_dt(self):
+        g = self.grid
+        return 1/(2*self.nu*(1/g.dx**2 + 1/g.dy**2))
+
+
+class ConvDiff2D(Solver2D):
+    # Boundary condition: Dirichlet u = v = bc, or 'periodic' / 'neumann'
+    # fused: one-pass compiled update of u and v (fused.py, numba) with the
+    # same results, ensembles included; None uses it whenever numba is
+    # installed
+    nwork = 2
+
+    def __init__(self, grid, u, v, nu, dt, bc=1., fused=None):
+        Solver2D.__init__(self, grid, dt, u, v, bc=bc, nu=nu)
+        if fused is None:
+            fused = _fused.supports(self.dtype, self.nu, self.dt)
+        elif fused and not _fused.supports(self.dtype, self.nu, self.dt):
+            raise ValueError('the fused kernel needs numba')
+        self.fused = fused
+
+    def compiled(self):
+        # advance_to of a float32 ensemble can set a float64 dt per
+        # member: the numpy path, which computes it in float64
+        return bool(self.fused) and \
+               _fused.supports(self.dtype, self.nu, self.dt)
+
+    def interior(self, new, old, work):
+        g = self.grid
+        (un, vn), (uo, vo) = new, old
+        if self.compiled():
+            _fused.conv_diff2d_uv(un, vn, uo, vo, self.nu, self.dt, g.dx, g.dy)
+            return
+        kernels.conv_diff2d(un, uo, uo, vo, self.nu, self.dt, g.dx, g.dy,
+                            *work)
+        # Remark: the v diffusion term of 08_nonl_conv_diff.py has always
+        # paired its i-1/j-1 neighbours crosswise; kept as is so results
+        # stay unchanged
+        kernels.conv_diff2d(vn, vo, uo, vo, self.nu, self.dt, g.dx, g.dy,
+                            *work, fxm=vo[...,1:-1,0:-2],
+                            fym=vo[...,0:-2,1:-1])
+
+    def stable_dt(self):
+        g = self.grid
+        u, v = self.fields
+        return 1/(self.amax(u)/g.dx + self.amax(v)/g.dy +
+                  2*self.nu*(1/g.dx**2 + 1/g.dy**2))
+
+
+# 3D: fields (u, v, w) on (nx, ny, nz)
+######################################################################
+class Solver3D(Solver2D):
+    # the stepping of Solver2D with slabs of the first axis (x) as strips:
+    # two buffers per field and work arrays of one slab (per thread), so
+    # the memory stays near two copies of the fields. bc: Dirichlet value
+    # of the walls, None: they keep their values
+    names = ('u', 'v', 'w')
+    dirichlet = staticmethod(kernels.dirichlet3d)
+
+    def __init__(self, grid, dt, *fields, bc=None, **params):
+        if isinstance(bc, str):
+            raise ValueError('the 3D solvers take Dirichlet walls or None, '
+                             'not %r' % bc)
+        Solver2D.__init__(self, grid, dt, *fields, bc=bc, **params)
+
+
+class LinConv3D(Solver3D):
+    # 05 in 3D
+    def __init__(self, grid, u, v, w, c, dt, bc=None):
+        Solver3D.__init__(self, grid, dt, u, v, w, bc=bc, c=c)
+
+    def interior(self, new, old, work):
+        g = self.grid
+        for fn, fo in zip(new, old):
+            kernels.lin_conv3d(fn, fo, self.c, self.dt, g.dx, g.dy, g.dz,
+                               *work)
+
+    def stable_dt(self):
+        g = self.grid
+        return 1/(numpy.abs(self.c)*(1/g.dx + 1/g.dy + 1/g.dz))
+
+
+class Diffusion3D(Solver3D):
+    # 07 in 3D, Dirichlet u = v = w = bc
+    def __init__(self, grid, u, v, w, nu, dt, bc=1.):
+        Solver3D.__init__(self, grid, dt, u, v, w, bc=bc, nu=nu)
+
+    def interior(self, new, old, work):
+        g = self.grid
+        for fn, fo in zip(new, old):
+            kernels.diffusion3d(fn, fo, self.nu, self.dt, g.dx, g.dy, g.dz,
+                                *work)
+
+    def stable_dt(self):
+        g = self.grid
+        return 1/(2*self.nu*(1/g.dx**2 + 1/g.dy**2 + 1/g.dz**2))
+
+
+class ConvDiff3D(Solver3D):
+    # 08 in 3D, Dirichlet u = v = w = bc
+    nwork = 2
+
+    def __init__(self, grid, u, v, w, nu, dt, bc=1.):
+        Solver3D.__init__(self, grid, dt, u, v, w, bc=bc, nu=nu)
+
+    def interior(self, new, old, work):
+        g = self.grid
+        for fn, fo in zip(new, old):
+            kernels.conv_diff3d(fn, fo, *old, self.nu, self.dt, g.dx, g.dy,
+                                g.dz, *work)
+
+    def stable_dt(self):
+        g = self.grid
+        u, v, w = self.fields
+        return 1/(self.amax(u)/g.dx + self.amax(v)/g.dy + self.amax(w)/g.dz +
+                  2*self.nu*(1/g.dx**2 + 1/g.dy**2 + 1/g.dz**2))
@@ -0,0 +1,147 @@
+import functools
+
+import numpy
+
+from . import multigrid
+from .multigrid import apply_bc
+
+######################################################################
+# SPARSE-MATRIX POISSON BACKEND                                      #
+######################################################################
+# The 5-point operator on the interior points is assembled once per grid
+# and boundary-condition signature as a sparse matrix. Dirichlet sides
+# are moved to the right-hand side, 'neumann' sides (p on the boundary =
+# p on the first interior line, as in the scripts) are eliminated into
+# the diagonal, so the matrix stays symmetric. We solve with -A, which is
+# positive definite unless all sides are Neumann.
+#
+# Operators are kept in an LRU cache keyed by (nx, ny, dx, dy, signature)
+# where the signature only says which sides are Dirichlet/Neumann, the
+# wall values do not enter the matrix. Each cached operator builds on
+# first use (scipy.sparse is imported with the first operator, not with
+# the package)
+#   'splu'  a sparse LU factorization: every new b is one pair of
+#           triangular solves
+#   'pcg'   the multigrid hierarchy of the grid: one symmetric V-cycle
+#           (see multigrid.py) preconditions conjugate gradients, a few
+#           iterations per new b independent of the grid size. (scipy
+#           has no incomplete Cholesky and its incomplete LU is not
+#           symmetric, CG does not converge with it.)
+
+CACHE_SIZE = 8
+
+
+@functools.lru_cache(maxsize=None)
+def scipy():
+    # scipy with scipy.sparse and scipy.sparse.linalg loaded
+    try:
+        import scipy.sparse
+        import scipy.sparse.linalg
+    except ImportError: # scipy is only needed for this backend
+        raise ImportError('the sparse backend needs scipy') from None
+    return scipy
+
+
+def signature(bc):
+    return tuple('N' if isinstance(v, str) else 'D' for v in bc)
+
+
+def laplacian1d(n, h, neumann_lo, neumann_hi):
+    main = numpy.full(n, -2.)
+    main[0] += neumann_lo
+    main[-1] += neumann_hi
+    off = numpy.ones(n-1)
+    return scipy().sparse.diags([off, main, off], [-1, 0, 1])/h**2
+
+
+class Operator(object):
+    def __init__(self, nx, ny, dx, dy, sig):
+        sp = scipy().sparse
+        lx = laplacian1d(nx-2, dx, sig[0] == 'N', sig[1] == 'N')
+        ly = laplacian1d(ny-2, dy, sig[2] == 'N', sig[3] == 'N')
+        a = sp.kron(lx, sp.identity(ny-2)) + sp.kron(sp.identity(nx-2), ly)
+        self.nx, self.ny, self.dx, self.dy = nx, ny, dx, dy
+        self.bc = tuple(multigrid.NEUMANN if s == 'N' else 0 for s in sig)
+        self.shape = (nx-2, ny-2)
+        self.matrix = (-a).tocsc()
+        self._lu = None
+        self._precond = None
+
+    @property
+    def lu(self):
+        if self._lu is None:
+            self._lu = scipy().sparse.linalg.splu(self.matrix)
+        return self._lu
+
+    @property
+    def preconditioner(self):
+        if self._precond is None:
+            levels = multigrid.hierarchy(self.nx, self.ny, self.dx, self.dy)
+            b = numpy.zeros((self.nx, self.ny))
+            def vcycle(f):
+                # e ~ (-A)^-1 f: one V-cycle for A e = -f from e = 0
+                e = numpy.zeros((self.nx, self.ny))
+                b[1:-1,1:-1] = -f.reshape(self.shape)
+                multigrid.vcycle(levels, 0, e, b, self.bc)
+                return e[1:-1,1:-1].ravel()
+            n = self.matrix.shape[0]
+            linalg = scipy().sparse.linalg
+            self._precond = linalg.LinearOperator((n, n), vcycle)
+        return self._precond
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def operator(nx, ny, dx, dy, sig):
+    return Operator(nx, ny, dx, dy, sig)
+
+
+def rhs(p, b, dx, dy, bc):
+    # -(b - Dirichlet wall contributions) on the interior points
+    r = b[1:-1,1:-1].copy()
+    if not isinstance(bc[0], str):
+        r[0,:] -= p[0,1:-1]/dx**2
+    if not isinstance(bc[1], str):
+        r[-1,:] -= p[-1,1:-1]/dx**2
+    if not isinstance(bc[2], str):
+        r[:,0] -= p[1:-1,0]/dy**2
+    if not isinstance(bc[3], str):
+        r[:,-1] -= p[1:-1,-1]/dy**2
+    return -r.ravel()
+
+
+def solve(p, b, dx, dy, bc, method='splu', tol=1e-8, maxiter=None,
+          metrics=None):
+    """Solve d2p/dx2 + d2p/dy2 = b with the cached sparse operator of the
+    grid. method='splu' is a direct solve, 'pcg' preconditioned conjugate
+    gradients from the current p until ||r||_2 <= tol*||rhs||_2. p is
+    updated in place, returns (p, iterations)."""
+    nx, ny = p.shape
+    op = operator(nx, ny, dx, dy, signature(bc))
+    apply_bc(p, bc)
+    f = rhs(p, b, dx, dy, bc)
+    if metrics is not None:
+        t0 = [metrics.begin(0)]
+    if method == 'splu':
+        x, it = op.lu.solve(f), 1
+        if metrics is not None:
+            metrics.end(t0[0], f.size, 1)
+    elif method == 'pcg':
+        count = [0]
+        def callback(xk):
+            count[0] += 1
+            if metrics is not None:
+                # an iteration is the time between callbacks, scipy gives
+                # no hook before one (no pre_step but the first)
+                metrics.end(t0[0], f.size, count[0])
+                t0[0] = metrics.clock()
+        x, fail = scipy().sparse.linalg.cg(op.matrix, f,
+                                           x0=p[1:-1,1:-1].ravel(), rtol=tol,
+                                           maxiter=maxiter,
+                                           M=op.preconditioner,
+                                           callback=callback)
+        it = count[0]
+    else:
+        raise ValueError('unknown sparse method %r' % method)
+    p[1:-1,1:-1] = x.reshape(op.shape)
+    apply_bc(p, bc)
+    return p, it
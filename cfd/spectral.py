@@ -0,0 +1,96 @@
+import functools
+
+import numpy
+
+from .multigrid import apply_bc
+
+######################################################################
+# DIRECT POISSON SOLVER WITH DISCRETE SINE TRANSFORMS               #
+######################################################################
+# With Dirichlet values on all four sides the 5-point Laplacian on the
+# interior points is diagonalized by the type-I discrete sine transform
+# along x and y: p = IDST(DST(b)/(lx + ly)) with the eigenvalues
+# lx_k = (2*cos(pi*k/(nx-1)) - 2)/dx**2 (ly alike). Non-zero wall values
+# are moved to the right-hand side. O(N log N), no iterations.
+#
+# The eigenvalue tables are cached per (nx, ny, dx, dy); scipy.fft keeps
+# its own cache of transform plans per length, the numpy fallback caches
+# its work buffers per shape. Repeated solves on the same grid only pay
+# for the two transforms. scipy.fft is imported on the first transform,
+# not with the package.
+
+
+def supported(bc):
+    return not any(isinstance(v, str) for v in bc)
+
+
+@functools.lru_cache(maxsize=16)
+def eigenvalues(nx, ny, dx, dy):
+    lx = (2*numpy.cos(numpy.pi*numpy.arange(1, nx-1)/(nx-1)) - 2)/dx**2
+    ly = (2*numpy.cos(numpy.pi*numpy.arange(1, ny-1)/(ny-1)) - 2)/dy**2
+    lam = lx[:,None] + ly[None,:]
+    lam.flags.writeable = False
+    return lam
+
+
+@functools.lru_cache(maxsize=None)
+def scipy_fft():
+    # scipy.fft, None without scipy
+    try:
+        from scipy import fft
+    except ImportError: # numpy fallback below
+        return None
+    return fft
+
+
+# numpy fallback: DST-I of length n as the FFT of the odd extension
+##############################
+@functools.lru_cache(maxsize=16)
+def _odd_buffer(shape, axis):
+    shape = list(shape)
+    shape[axis] = 2*(shape[axis]+1)
+    return numpy.zeros(shape)
+
+
+def _dst1(a, axis):
+    # same normalization as scipy.fft.dst(a, type=1)
+    n = a.shape[axis]
+    ext = _odd_buffer(a.shape, axis)
+    idx = [slice(None)]*a.ndim
+    idx[axis] = slice(1, n+1)
+    ext[tuple(idx)] = a
+    idx[axis] = slice(n+2, None)
+    ext[tuple(idx)] = -numpy.flip(a, axis)
+    idx[axis] = slice(1, n+1)
+    return -numpy.fft.rfft(ext, axis=axis).imag[tuple(idx)]
+
+
+def dst2(a):
+    fft = scipy_fft()
+    if fft is not None:
+        return fft.dstn(a, type=1)
+    return _dst1(_dst1(a, 0), 1)
+
+
+def idst2(a):
+    fft = scipy_fft()
+    if fft is not None:
+        return fft.idstn(a, type=1)
+    nx, ny = a.shape
+    return _dst1(_dst1(a, 0), 1)/(4*(nx+1)*(ny+1))
+
+
+def solve(p, b, dx, dy, bc=(0, 0, 0, 0)):
+    """Solve d2p/dx2 + d2p/dy2 = b with Dirichlet values bc on the sides
+    (x = xmin, x = xmax, y = ymin, y = ymax). p is updated in place."""
+    if not supported(bc):
+        raise ValueError('the sine transform needs Dirichlet values on all sides')
+    nx, ny = p.shape
+    apply_bc(p, bc)
+    rhs = b[1:-1,1:-1].copy()
+    rhs[0,:] -= p[0,1:-1]/dx**2
+    rhs[-1,:] -= p[-1,1:-1]/dx**2
+    rhs[:,0] -= p[1:-1,0]/dy**2
+    rhs[:,-1] -= p[1:-1,-1]/dy**2
+    p[1:-1,1:-1] = idst2(dst2(rhs)/eigenvalues(nx, ny, dx, dy))
+    return p
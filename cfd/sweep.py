@@ -0,0 +1,158 @@
+import argparse
+import concurrent.futures
+import functools
+import itertools
+import os
+import time
+
+import numpy
+
+from .grid import Grid2D
+from .solver import LinConv2D, NonlConv2D, Diffusion2D, ConvDiff2D
+
+######################################################################
+# PARAMETER SWEEPS OVER A PROCESS POOL                               #
+######################################################################
+# A case is a function of keyword parameters that sets up one of the 2D
+# scripts and returns its solver. sweep() runs the case for every
+# combination of a parameter grid in a concurrent.futures process pool,
+# without plotting, and returns one structured array with a record per
+# run: the parameters, summary metrics of the final fields and the final
+# fields themselves (a fixed-shape column when every run has the same
+# grid, an object column otherwise).
+#
+#   res = sweep('conv_diff2d', nx=[41, 51, 61], nu=[0.05, 0.1])
+#   res[res['nu'] == 0.1]['u_max']
+#
+# or from the shell, e.g.
+#   python -m cfd.sweep conv_diff2d nx=41,51,61 nu=0.05,0.1 -o sweep.npy
+
+
+def hat(grid, base, dtype=float):
+    # the scripts' hat function: 2 on [0.5, 1]**2, base elsewhere
+    f = grid.zeros(dtype) + base
+    f[int(.5/grid.dy):int(1/grid.dy)+1, int(.5/grid.dx):int(1/grid.dx)+1] = 2
+    return f
+
+
+# Cases: the defaults are the ones of the scripts, dtype (Python API only)
+# is the precision of the fields
+##############################
+def lin_conv2d(nx=81, nt=100, sigma=0.2, c=1, dtype=float):
+    # 05_2d_lin_conv.py
+    grid = Grid2D(nx, nx, 0, 2, 0, 2)
+    return nt, LinConv2D(grid, hat(grid, 0, dtype), hat(grid, 0, dtype), c,
+                         sigma*grid.dx)
+
+
+def nonl_conv2d(nx=81, nt=101, tmax=0.5, dtype=float):
+    # 06_2d_nonl_conv.py
+    grid = Grid2D(nx, nx, 0, 2, 0, 2)
+    return nt, NonlConv2D(grid, hat(grid, 1, dtype), hat(grid, 1, dtype),
+                          tmax/(nt-1))
+
+
+def diffusion2d(nx=51, nt=151, tmax=0.5, nu=.1, dtype=float):
+    # 07_2d_lin_diff.py, one of its three plotted intervals
+    grid = Grid2D(nx, nx, 0, 2, 0, 2)
+    return nt, Diffusion2D(grid, hat(grid, 1, dtype), hat(grid, 1, dtype), nu,
+                           tmax/(nt-1), bc=1)
+
+
+def conv_diff2d(nx=51, nt=201, tmax=0.5, nu=.1, dtype=float):
+    # 08_nonl_conv_diff.py
+    grid = Grid2D(nx, nx, 0, 2, 0, 2)
+    return nt, ConvDiff2D(grid, hat(grid, 1, dtype), hat(grid, 1, dtype), nu,
+                          tmax/(nt-1), bc=1)
+
+
+CASES = {f.__name__: f for f in (lin_conv2d, nonl_conv2d, diffusion2d,
+                                 conv_diff2d)}
+
+
+# Runner
+##############################
+def combinations(**axes):
+    names = list(axes)
+    return [dict(zip(names, values))
+            for values in itertools.product(*axes.values())]
+
+
+def run(case, params):
+    """One run of a case without plotting: returns (metrics, fields)."""
+    t = time.perf_counter()
+    nt, solver = CASES[case](**params)
+    with numpy.errstate(all='ignore'): # unstable runs are reported, not raised
+        solver.advance(nt)
+        metrics = {'time': time.perf_counter() - t,
+                   'finite': all(numpy.isfinite(f).all()
+                                 for f in solver.fields)}
+        for name, f in zip(solver.names, solver.fields):
+            metrics[name + '_min'] = f.min()
+            metrics[name + '_max'] = f.max()
+            metrics[name + '_mean'] = f.mean()
+            metrics[name + '_rms'] = numpy.sqrt(numpy.mean(f**2))
+    return metrics, dict(zip(solver.names, solver.fields))
+
+
+def sweep(case, workers=None, **axes):
+    """Run case for every combination of the parameter lists in axes on a
+    pool of workers processes (default: all cores). Returns a structured
+    array with one record per run in the order of itertools.product."""
+    combos = combinations(**axes)
+    if not combos: # an empty axis
+        return collect(axes, combos, [])
+    workers = min(workers or os.cpu_count() or 1, len(combos))
+    with concurrent.futures.ProcessPoolExecutor(workers) as pool:
+        chunksize = max(1, len(combos)//(4*workers))
+        results = list(pool.map(functools.partial(run, case), combos,
+                                chunksize=chunksize))
+    return collect(axes, combos, results)
+
+
+def collect(axes, combos, results):
+    dtype = [(k, numpy.asarray(v).dtype) for k, v in axes.items()]
+    if not results: # no runs, the parameter columns only
+        return numpy.empty(0, dtype=dtype)
+    metrics, fields = results[0]
+    dtype += [(k, numpy.asarray(v).dtype) for k, v in metrics.items()]
+    for k in fields:
+        # the fields keep their precision (float32 runs: float32 columns)
+        shapes = set(r[1][k].shape for r in results)
+        ftype = numpy.result_type(*[r[1][k].dtype for r in results])
+        dtype.append((k, ftype, shapes.pop()) if len(shapes) == 1
+                     else (k, object))
+    out = numpy.empty(len(combos), dtype=dtype)
+    for rec, params, (metrics, fields) in zip(out, combos, results):
+        for k, v in itertools.chain(params.items(), metrics.items(),
+                                    fields.items()):
+            rec[k] = v
+    return out
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Parameter sweep of a 2D case')
+    parser.add_argument('case', choices=sorted(CASES))
+    parser.add_argument('params', nargs='*', metavar='name=v1,v2,...')
+    parser.add_argument('-j', '--workers', type=int, default=None)
+    parser.add_argument('-o', '--output', default=None,
+                        help='save the result array (.npy)')
+    args = parser.parse_args(argv)
+    axes = {}
+    for p in args.params:
+        name, values = p.split('=')
+        axes[name] = [int(v) if v.lstrip('-').isdigit() else float(v)
+                      for v in values.split(',')]
+    res = sweep(args.case, args.workers, **axes)
+    fields = [n for n in res.dtype.names
+              if res.dtype[n].shape or res.dtype[n] == object]
+    scalars = [n for n in res.dtype.names if n not in fields]
+    print(' '.join('%12s' % n for n in scalars))
+    for rec in res:
+        print(' '.join('%12.6g' % rec[n] for n in scalars))
+    if args.output:
+        numpy.save(args.output, res, allow_pickle=True)
+
+
+if __name__ == '__main__':
+    main()
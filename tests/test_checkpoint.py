@@ -0,0 +1,33 @@
+import numpy
+import pytest
+
+import cfd
+from cfd import checkpoint
+from cfd.sweep import hat
+
+
+def conv_diff2d():
+    g = cfd.Grid2D(31, 31)
+    return cfd.ConvDiff2D(g, hat(g, 1), hat(g, 1), .05, 0.001, bc=1)
+
+
+def burgers():
+    g = cfd.Grid1D(101, 0, 2*numpy.pi)
+    return cfd.Burgers1D(g, cfd.sawtooth(g.x, .1), .1, 0.003)
+
+
+@pytest.mark.parametrize('make', [conv_diff2d, burgers])
+@pytest.mark.parametrize('scheme', ['euler', 'ssprk3'])
+def test_resume_is_uninterrupted(tmp_path, make, scheme):
+    ref = make()
+    ref.scheme = scheme
+    ref.advance(40)
+    solver = make()
+    solver.scheme = scheme
+    checkpoint.run(solver, 17, str(tmp_path), every=5)
+    resumed = checkpoint.resume(str(tmp_path))
+    assert resumed.n == 17 and resumed.scheme == scheme
+    checkpoint.run(resumed, 40, str(tmp_path), every=5)
+    assert all(numpy.array_equal(a, b)
+               for a, b in zip(ref.fields, resumed.fields))
+    assert resumed.n == ref.n and resumed.t == ref.t
@@ -0,0 +1,23 @@
+import numpy
+import pytest
+
+import cfd
+from cfd.decomp import Decomposed
+from cfd.sweep import hat
+
+
+@pytest.mark.parametrize('workers', [1, 3])
+@pytest.mark.parametrize('make', [
+    lambda g: cfd.ConvDiff2D(g, hat(g, 1), hat(g, 1), .05, 0.001, bc=1),
+    lambda g: cfd.LinConv2D(g, hat(g, 1), hat(g, 1), [1., .5], 0.005),
+])
+def test_decomposed_is_serial(make, workers):
+    g = cfd.Grid2D(31, 27)
+    ref = make(g).advance(25)
+    solver = make(g)
+    with Decomposed(solver, workers) as par:
+        par.advance(10)
+        par.advance(15)
+    assert all(numpy.array_equal(a, b)
+               for a, b in zip(ref.fields, solver.fields))
+    assert solver.n == ref.n and solver.t == ref.t
@@ -0,0 +1,55 @@
+import numpy
+import pytest
+
+import cfd
+from cfd import render, snapshots
+
+pytest.importorskip('matplotlib')
+
+
+def run(path, solver, nt=4):
+    with snapshots.Writer(path, solver, nsnap=nt+1) as w:
+        w.stream(nt, every=1)
+    return str(path)
+
+
+@pytest.fixture
+def run3d(tmp_path):
+    g = cfd.Grid3D(11, 9, 7)
+    solver = cfd.ConvDiff3D(g, 1., 1., 1., .05, 1e-3)
+    solver.u[3:6,3:6,2:5] = 2
+    return run(tmp_path / 'run3d', solver)
+
+
+def test_plane():
+    g = cfd.Grid3D(5, 4, 3)
+    f = numpy.arange(2*5*4*3.).reshape(2, 5, 4, 3)
+    assert numpy.array_equal(render.plane(g, f), f[...,1])
+    g2 = cfd.Grid2D(5, 4)
+    assert render.plane(g2, f[...,0]).shape == (2, 5, 4)
+
+
+def test_limits_of_the_mid_plane(run3d):
+    s = snapshots.load(run3d)
+    lims = render.limits(s, range(len(s)))
+    mid = s.fields[:,:,:,:,s.grid.nz//2]
+    for (lo, hi), f in zip(lims, mid.transpose(1, 0, 2, 3)):
+        assert lo == f.min() and hi == f.max()
+
+
+@pytest.mark.parametrize('kind', ['surf', 'image'])
+def test_render_3d(run3d, tmp_path, kind):
+    outs = render.render(run3d, str(tmp_path / kind), kind=kind, workers=1,
+                         frames=[0, 4], maxlines=10, dpi=20)
+    assert len(outs) == 2
+    for out in outs:
+        with open(out, 'rb') as f:
+            assert f.read(8) == b'\x89PNG\r\n\x1a\n'
+
+
+def test_render_2d(tmp_path):
+    g = cfd.Grid2D(21, 21)
+    solver = cfd.ConvDiff2D(g, g.zeros() + 1, g.zeros() + 1, .05, 1e-3)
+    path = run(tmp_path / 'run2d', solver, nt=2)
+    outs = render.render(path, str(tmp_path / 'frames'), workers=1, dpi=20)
+    assert len(outs) == 3
@@ -0,0 +1,136 @@
+import numpy
+import pytest
+
+import cfd
+from cfd import fused
+from cfd.sweep import hat
+
+
+def same(a, b):
+    return all(numpy.array_equal(x, y) for x, y in zip(a.fields, b.fields))
+
+
+# Copy-per-step updates of the original scripts
+##############################
+def lin_conv(u, c, dt, dx):
+    # 01
+    up = u.copy()
+    u[1:] = up[1:] - c*dt/dx*(up[1:] - up[0:-1])
+    u[0] = up[0] - c*dt/dx*(up[0] - up[-1])
+
+
+def lin_conv2d(u, v, c, dt, dx, dy):
+    # 05
+    up = u.copy()
+    vp = v.copy()
+    u[1:-1,1:-1] = up[1:-1,1:-1] - c*dt/dx*(up[1:-1,1:-1] - up[0:-2,1:-1]) - \
+            c*dt/dy*(up[1:-1,1:-1] - up[1:-1,0:-2])
+    v[1:-1,1:-1] = vp[1:-1,1:-1] - c*dt/dx*(vp[1:-1,1:-1] - vp[0:-2,1:-1]) - \
+            c*dt/dy*(vp[1:-1,1:-1] - vp[1:-1,0:-2])
+
+
+def diffusion2d(u, v, nu, dt, dx, dy):
+    # 07
+    up = u.copy()
+    vp = v.copy()
+    u[1:-1,1:-1] = up[1:-1,1:-1]+nu*dt*(1/dx**2*(up[1:-1,2:]-2*up[1:-1,1:-1]+up[1:-1,0:-2])+\
+            1/dy**2*(up[2:,1:-1]-2*up[1:-1,1:-1]+up[0:-2,1:-1]))
+    v[1:-1,1:-1] = vp[1:-1,1:-1]+nu*dt*(1/dx**2*(vp[1:-1,2:]-2*vp[1:-1,1:-1]+vp[1:-1,0:-2])+\
+            1/dy**2*(vp[2:,1:-1]-2*vp[1:-1,1:-1]+vp[0:-2,1:-1]))
+    for f in (u, v):
+        f[0,:] = f[-1,:] = f[:,0] = f[:,-1] = 1
+
+
+def conv_diff2d(u, v, nu, dt, dx, dy):
+    # 08
+    up = u.copy()
+    vp = v.copy()
+    u[1:-1,1:-1] = up[1:-1,1:-1] + dt*(-up[1:-1,1:-1]/dx*(up[1:-1,1:-1] - up[0:-2,1:-1]) \
+            - vp[1:-1,1:-1]/dy*(up[1:-1,1:-1] - up[1:-1,0:-2]) \
+            + nu*(1/dx**2*(up[2:,1:-1] - 2*up[1:-1,1:-1] + up[0:-2,1:-1]) \
+            + 1/dy**2*(up[1:-1,2:] - 2*up[1:-1,1:-1] + up[1:-1,0:-2])))
+    v[1:-1,1:-1] = vp[1:-1,1:-1] + dt*(-up[1:-1,1:-1]/dx*(vp[1:-1,1:-1] - vp[0:-2,1:-1]) - \
+            vp[1:-1,1:-1]/dy*(vp[1:-1,1:-1] - vp[1:-1,0:-2]) + \
+            nu*(1/dx**2*(vp[2:,1:-1] - 2*vp[1:-1,1:-1] + vp[1:-1,0:-2]) + \
+            1/dy**2*(vp[1:-1,2:] - 2*vp[1:-1,1:-1] + vp[0:-2,1:-1])))
+    for f in (u, v):
+        f[0,:] = f[-1,:] = f[:,0] = f[:,-1] = 1
+
+
+# The solvers against the scripts, bit for bit
+##############################
+def test_lin_conv():
+    g = cfd.Grid1D(41, 0, 2)
+    u = g.zeros() + 1
+    u[int(.5/g.dx):int(1/g.dx)+1] = 2
+    solver = cfd.LinConv1D(g, u, 1., 0.025).advance(25)
+    for n in range(25):
+        lin_conv(u, 1., 0.025, g.dx)
+    assert numpy.array_equal(solver.u, u)
+
+
+@pytest.mark.parametrize('case', ['05', '07', '08'])
+def test_scripts_2d(case):
+    g = cfd.Grid2D(41, 41)
+    u, v = hat(g, 1), hat(g, 1)
+    if case == '05':
+        solver = cfd.LinConv2D(g, u, v, 1., 0.01)
+        ref, args = lin_conv2d, (1., 0.01)
+    elif case == '07':
+        solver = cfd.Diffusion2D(g, u, v, .05, 0.001, bc=1)
+        ref, args = diffusion2d, (.05, 0.001)
+    else:
+        solver = cfd.ConvDiff2D(g, u, v, .05, 0.001, bc=1, fused=False)
+        ref, args = conv_diff2d, (.05, 0.001)
+    solver.advance(30)
+    for n in range(30):
+        ref(u, v, *args, g.dx, g.dy)
+    assert numpy.array_equal(solver.u, u)
+    assert numpy.array_equal(solver.v, v)
+
+
+# Execution paths with the same results
+##############################
+@pytest.mark.parametrize('make', [
+    lambda g: cfd.NonlConv2D(g, hat(g, 1), hat(g, 1), 0.001),
+    lambda g: cfd.ConvDiff2D(g, hat(g, 1), hat(g, 1), .05, 0.001, bc=1,
+                             fused=False),
+    lambda g: cfd.Diffusion2D(g, hat(g, 1), hat(g, 1), .05, 0.001,
+                              bc='periodic'),
+])
+def test_tiled_threaded_2d(make):
+    g = cfd.Grid2D(41, 37)
+    whole = make(g)
+    whole.tile = 0
+    whole.advance(20)
+    tiled = make(g)
+    tiled.tile = 3
+    tiled.advance(20)
+    assert same(whole, tiled)
+    with make(g) as threaded:
+        threaded.tile, threaded.threads = 3, 3
+        threaded.advance(20)
+        assert same(whole, threaded)
+    assert threaded.pool is None
+
+
+def test_tiled_threaded_3d():
+    g = cfd.Grid3D(17, 13, 11)
+    runs = []
+    for tile, threads in ((0, 1), (2, 1), (2, 3)):
+        with cfd.ConvDiff3D(g, 1., 1., 1., .05, 0.001) as s:
+            s.u[4:8,4:8,3:6] = 2
+            s.tile, s.threads = tile, threads
+            runs.append(s.advance(10))
+    assert same(runs[0], runs[1]) and same(runs[0], runs[2])
+
+
+@pytest.mark.skipif(not fused.available(), reason='needs numba')
+@pytest.mark.parametrize('dtype', [numpy.float64, numpy.float32])
+@pytest.mark.parametrize('nu', [.05, numpy.array([.01, .05, .1])])
+def test_fused(dtype, nu):
+    g = cfd.Grid2D(33, 29)
+    runs = [cfd.ConvDiff2D(g, hat(g, 1, dtype), hat(g, 1, dtype), nu, 0.001,
+                           fused=f).advance(20) for f in (True, False)]
+    assert runs[0].compiled() and not runs[1].compiled()
+    assert same(*runs)